@@ -6,9 +6,13 @@ import logging
 import sys
 from typing import Any, Dict, Optional
 
+import orjson
 import structlog
 from structlog.typing import Processor
 
+from src.config.settings import get_settings
+from src.utils.context import request_id_var, user_id_var
+
 
 def setup_logging(log_level: str = "INFO", log_format: str = "json") -> None:
     """
@@ -55,16 +59,20 @@ def setup_logging(log_level: str = "INFO", log_format: str = "json") -> None:
     ]
     
     if log_format == "json":
-        processors.append(structlog.processors.JSONRenderer())
+        processors.append(structlog.processors.JSONRenderer(serializer=_orjson_dumps))
     else:
         processors.extend([
             structlog.dev.ConsoleRenderer(colors=True),
         ])
     
-    # Configure structlog
+    # Configure structlog. The filtering wrapper turns calls below the
+    # effective level into no-ops before any processor (notably the
+    # stack-walking CallsiteParameterAdder) runs.
     structlog.configure(
         processors=processors,
-        wrapper_class=structlog.stdlib.BoundLogger,
+        wrapper_class=structlog.make_filtering_bound_logger(
+            getattr(logging, effective_log_level.upper())
+        ),
         logger_factory=structlog.stdlib.LoggerFactory(),
         context_class=dict,
         cache_logger_on_first_use=True,
@@ -74,38 +82,27 @@ def setup_logging(log_level: str = "INFO", log_format: str = "json") -> None:
     _suppress_noisy_loggers(log_level)
 
 
+def _orjson_dumps(obj: Any, default: Any = None, **kwargs: Any) -> str:
+    """Serialize a log event with orjson; stdlib logging expects str."""
+    return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 def add_correlation_id(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
     """Add correlation ID and context from request to log events."""
-    import contextvars
-    
-    # Try to get request ID from context
-    try:
-        from src.utils.context import request_id_var
-        request_id = request_id_var.get(None)
-        if request_id:
-            event_dict["request_id"] = request_id
-    except (ImportError, LookupError):
-        pass
+    # Request and user IDs are set per request by the auth middleware
+    request_id = request_id_var.get()
+    if request_id:
+        event_dict["request_id"] = request_id
     
-    # Try to get user ID from context
-    try:
-        from src.utils.context import user_id_var
-        user_id = user_id_var.get(None)
-        if user_id:
-            event_dict["user_id"] = user_id
-    except (ImportError, LookupError):
-        pass
+    user_id = user_id_var.get()
+    if user_id:
+        event_dict["user_id"] = user_id
     
     # Add service context
     event_dict["service"] = "api-gateway"
     
     # Add environment context
-    try:
-        from src.config.settings import get_settings
-        settings = get_settings()
-        event_dict["environment"] = settings.environment
-    except:
-        pass
+    event_dict["environment"] = get_settings().environment
     
     return event_dict
 
@@ -66,6 +66,7 @@ class Settings(BaseSettings):
     enable_caching: bool = True
     enable_metrics: bool = True
     enable_docs: bool = True
+    skip_trusted_validation: bool = False
     
     # CORS configuration
     allowed_origins_str: str = Field(default="*", description="Allowed CORS origins (comma-separated or JSON array)", alias="ALLOWED_ORIGINS")
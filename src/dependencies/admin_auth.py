@@ -2,7 +2,11 @@
 Admin authentication dependency using HTTP Basic Auth.
 """
 
-import secrets
+import base64
+import hashlib
+import hmac
+from collections import OrderedDict
+from typing import Optional, Tuple
 from fastapi import Request, HTTPException, status
 import structlog
 
@@ -10,6 +14,59 @@ from src.config.settings import get_settings
 
 logger = structlog.get_logger(__name__)
 
+# Recent Basic credential checks, keyed by a digest of the Authorization
+# header so neither the raw credentials nor the admin secret are kept in
+# memory. Entries belong to the secret digest they were computed under and
+# are dropped when the configured secret changes.
+_CREDENTIALS_CACHE_SIZE = 32
+_credentials_cache: "OrderedDict[bytes, Tuple[str, bool]]" = OrderedDict()
+_credentials_cache_secret: Optional[bytes] = None
+
+
+def _digest(value: str) -> bytes:
+    """SHA-256 digest of a credential string."""
+    return hashlib.sha256(value.encode("utf-8")).digest()
+
+
+def _check_basic_credentials(auth_header: str, admin_secret_key: str) -> Tuple[str, bool]:
+    """
+    Decode a Basic Authorization header and check its password.
+    
+    Results are cached per header digest so admin UI polling doesn't decode
+    and compare the same value on every request.
+    
+    Returns:
+        Tuple of (username, password matches)
+        
+    Raises:
+        ValueError: If the credentials are malformed (not cached)
+    """
+    global _credentials_cache_secret
+    
+    secret_digest = _digest(admin_secret_key)
+    if _credentials_cache_secret is None or not hmac.compare_digest(secret_digest, _credentials_cache_secret):
+        _credentials_cache.clear()
+        _credentials_cache_secret = secret_digest
+    
+    header_digest = _digest(auth_header)
+    cached = _credentials_cache.get(header_digest)
+    if cached is not None:
+        _credentials_cache.move_to_end(header_digest)
+        return cached
+    
+    encoded_credentials = auth_header[6:]  # Remove "Basic "
+    decoded_credentials = base64.b64decode(encoded_credentials).decode("utf-8")
+    username, password = decoded_credentials.split(":", 1)
+    
+    # Use constant-time comparison to prevent timing attacks
+    result = username, hmac.compare_digest(password.encode("utf-8"), admin_secret_key.encode("utf-8"))
+    
+    _credentials_cache[header_digest] = result
+    if len(_credentials_cache) > _CREDENTIALS_CACHE_SIZE:
+        _credentials_cache.popitem(last=False)
+    
+    return result
+
 
 async def verify_admin_auth(request: Request) -> str:
     """
@@ -50,20 +107,13 @@ async def verify_admin_auth(request: Request) -> str:
         )
     
     try:
-        # Decode Base64 credentials
-        import base64
-        
-        encoded_credentials = auth_header[6:]  # Remove "Basic "
-        decoded_credentials = base64.b64decode(encoded_credentials).decode("utf-8")
-        username, password = decoded_credentials.split(":", 1)
-        
         # Verify password against admin secret key
-        # Use constant-time comparison to prevent timing attacks
-        if not secrets.compare_digest(password, settings.admin_secret_key):
+        username, authenticated = _check_basic_credentials(auth_header, settings.admin_secret_key)
+        
+        if not authenticated:
             logger.warning(
                 "Admin authentication failed - invalid key",
-                username=username,
-                key_prefix=password[:4] + "..." if len(password) > 4 else "***"
+                username=username
             )
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -74,6 +124,8 @@ async def verify_admin_auth(request: Request) -> str:
         logger.info("Admin authenticated successfully", username=username)
         return username
         
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.warning("Admin authentication failed - malformed credentials", error=str(e))
         raise HTTPException(
@@ -12,7 +12,8 @@ import structlog
 import uvicorn
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 
 from src.config.settings import get_settings
@@ -23,6 +24,8 @@ from src.middleware.circuit_breaker import CircuitBreakerMiddleware
 from src.routers import system, user, letta, agents, templates, llm_proxy, ams, admin_api, admin_ui
 from src.utils.metrics import setup_metrics, request_duration, request_counter
 from src.utils.cache import get_redis_client
+from src.services.ams_client import get_ams_client, close_ams_client
+from src.routers.letta import create_letta_client
 from src.utils.exceptions import setup_exception_handlers
 
 # Initialize settings and logging
@@ -57,6 +60,21 @@ async def lifespan(app: FastAPI):
     setup_metrics()
     logger.info("Prometheus metrics initialized")
     
+    # Create the shared AMS client (and its connection pool) up front so
+    # handlers only ever read the existing instance
+    await get_ams_client()
+    logger.info("AMS client initialized")
+    
+    # Same for the Letta client, which handlers read from app.state
+    app.state.letta_client = create_letta_client()
+    logger.info("Letta client initialized")
+
+    # Build the OpenAPI schema once at startup; FastAPI keeps it on
+    # app.openapi_schema so /openapi.json never walks the models again
+    if settings.enable_docs:
+        app.openapi()
+        logger.info("OpenAPI schema generated")
+
     # Validate upstream services connectivity
     if settings.environment == "production":
         await _validate_upstream_services()
@@ -68,6 +86,10 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down API Gateway")
     
+    # Close pooled AMS and Letta connections
+    await close_ams_client()
+    await app.state.letta_client.aclose()
+    
     # Close Redis connection
     if hasattr(app.state, 'redis') and app.state.redis:
         await app.state.redis.close()
@@ -107,6 +129,7 @@ app = FastAPI(
     docs_url="/docs" if settings.enable_docs else None,
     redoc_url="/redoc" if settings.enable_docs else None,
     openapi_url="/openapi.json" if settings.enable_docs else None,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -141,6 +164,11 @@ app.add_middleware(
     max_age=600  # Cache preflight response for 10 minutes
 )
 
+# Compress large JSON responses (agent lists, memory blocks); SSE responses
+# mark themselves Content-Encoding: identity so GZip passes them through
+# unbuffered
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Single optimized request logging middleware (must be first)
 @app.middleware("http")
 async def request_logging_middleware(request: Request, call_next):
@@ -258,13 +286,15 @@ async def request_logging_middleware(request: Request, call_next):
         raise
 
 
-# Add custom middleware (order matters - last added runs first)
-app.add_middleware(AuthMiddleware)
-app.add_middleware(CircuitBreakerMiddleware)
-
+# Add custom middleware (order matters - last added runs first).
+# Rate limiting sits inside authentication so requests are keyed by the
+# authenticated user rather than by client IP
 if settings.enable_rate_limiting:
     app.add_middleware(RateLimitMiddleware)
 
+app.add_middleware(AuthMiddleware)
+app.add_middleware(CircuitBreakerMiddleware)
+
 # Setup exception handlers
 setup_exception_handlers(app)
 
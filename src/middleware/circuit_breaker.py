@@ -2,7 +2,11 @@
 Circuit breaker middleware for upstream services with Redis state management.
 """
 
+import asyncio
+import sys
 import time
+from functools import partial
+from collections import deque
 from enum import Enum
 from typing import Dict, Optional, Set, Callable, Any
 from dataclasses import dataclass
@@ -13,7 +17,7 @@ import structlog
 
 from src.config.settings import get_settings
 from src.models.common import ErrorResponse, ErrorDetail
-from src.utils.cache import get_redis_client
+from src.utils.cache import get_redis_client, get_cached_redis_client
 from src.utils.metrics import metrics
 from src.utils.exceptions import CircuitBreakerError, ServiceUnavailableError
 
@@ -23,6 +27,9 @@ logger = structlog.get_logger(__name__)
 _last_log_times: Dict[str, float] = {}
 LOG_RATE_LIMIT = 30  # Log at most once every 30 seconds per service
 
+# Upper bound on in-flight background state writes per circuit breaker
+MAX_PENDING_STATE_WRITES = 32
+
 def should_log_circuit_breaker(service_name: str) -> bool:
     """Check if we should log circuit breaker message for this service."""
     current_time = time.time()
@@ -42,7 +49,29 @@ class CircuitBreakerState(str, Enum):
     HALF_OPEN = "half_open"  # Testing if service recovered
 
 
-@dataclass
+# States are stored in Redis as small ints indexing this tuple
+_STATE_BY_INT = (
+    CircuitBreakerState.CLOSED,
+    CircuitBreakerState.OPEN,
+    CircuitBreakerState.HALF_OPEN,
+)
+
+# Per-state base payloads for Redis persistence
+_STATE_TEMPLATES: Dict[CircuitBreakerState, Dict[str, Any]] = {
+    state: {"state": index} for index, state in enumerate(_STATE_BY_INT)
+}
+
+
+def _decode_state(raw: Optional[str]) -> CircuitBreakerState:
+    """Decode a state stored in Redis, accepting the legacy string form."""
+    if raw is None:
+        return CircuitBreakerState.CLOSED
+    if raw.isdigit():
+        return _STATE_BY_INT[int(raw)]
+    return CircuitBreakerState(raw)
+
+
+@dataclass(slots=True)
 class CircuitBreakerConfig:
     """Configuration for a circuit breaker."""
     service_name: str
@@ -57,42 +86,75 @@ class CircuitBreakerConfig:
 class CircuitBreaker:
     """Individual circuit breaker for a service."""
     
+    __slots__ = (
+        "config",
+        "redis_client",
+        "_state",
+        "_failure_count",
+        "_success_count",
+        "_last_failure_time",
+        "_state_change_time",
+        "_request_window",
+        "_window_failures",
+        "_pending_writes",
+        "_record_event",
+        "_set_state_metric",
+    )
+    
     def __init__(self, config: CircuitBreakerConfig, redis_client=None):
+        config.service_name = sys.intern(config.service_name)
         self.config = config
-        self.redis_client = redis_client
+        # Share the process-wide Redis pool when it is already initialized
+        self.redis_client = redis_client or get_cached_redis_client()
         self._state = CircuitBreakerState.CLOSED
         self._failure_count = 0
         self._success_count = 0
         self._last_failure_time = 0
         self._state_change_time = time.time()
-        self._request_window = []  # Sliding window of request results
+        # Sliding window of (timestamp, success) request results
+        self._request_window: deque = deque(maxlen=config.sliding_window_size)
+        self._window_failures = 0
+        self._pending_writes: Set[asyncio.Task] = set()
+        
+        # Metrics recorders pre-bound to this service
+        self._record_event = partial(metrics.record_circuit_breaker_event, config.service_name)
+        self._set_state_metric = partial(metrics.set_circuit_breaker_state, config.service_name)
     
     async def _get_redis(self):
         """Get Redis client for state persistence."""
         if self.redis_client is None:
+            # Fall back to the shared pool for breakers created before startup
             self.redis_client = await get_redis_client()
         return self.redis_client
     
+    @property
+    def state_key(self) -> str:
+        """Redis key holding this circuit breaker's state."""
+        return f"circuit_breaker:{self.config.service_name}:state"
+    
+    def _apply_state_data(self, state_data: Dict[str, str]):
+        """Apply a state hash read from Redis to this circuit breaker."""
+        if not state_data:
+            return
+        
+        self._state = _decode_state(state_data.get("state"))
+        self._failure_count = int(state_data.get("failure_count", 0))
+        self._success_count = int(state_data.get("success_count", 0))
+        self._last_failure_time = float(state_data.get("last_failure_time", 0))
+        self._state_change_time = float(state_data.get("state_change_time", time.time()))
+        
+        logger.debug(
+            "Circuit breaker state loaded from Redis",
+            service=self.config.service_name,
+            state=self._state,
+            failure_count=self._failure_count
+        )
+    
     async def _load_state_from_redis(self):
         """Load circuit breaker state from Redis."""
         try:
             redis = await self._get_redis()
-            state_key = f"circuit_breaker:{self.config.service_name}:state"
-            
-            state_data = await redis.hgetall(state_key)
-            if state_data:
-                self._state = CircuitBreakerState(state_data.get("state", "closed"))
-                self._failure_count = int(state_data.get("failure_count", 0))
-                self._success_count = int(state_data.get("success_count", 0))
-                self._last_failure_time = float(state_data.get("last_failure_time", 0))
-                self._state_change_time = float(state_data.get("state_change_time", time.time()))
-                
-                logger.debug(
-                    "Circuit breaker state loaded from Redis",
-                    service=self.config.service_name,
-                    state=self._state,
-                    failure_count=self._failure_count
-                )
+            self._apply_state_data(await redis.hgetall(self.state_key))
         
         except Exception as e:
             logger.warning(
@@ -105,15 +167,15 @@ class CircuitBreaker:
         """Save circuit breaker state to Redis."""
         try:
             redis = await self._get_redis()
-            state_key = f"circuit_breaker:{self.config.service_name}:state"
+            state_key = self.state_key
             
-            state_data = {
-                "state": self._state.value,
-                "failure_count": self._failure_count,
-                "success_count": self._success_count,
-                "last_failure_time": self._last_failure_time,
-                "state_change_time": self._state_change_time
-            }
+            state_data = dict(
+                _STATE_TEMPLATES[self._state],
+                failure_count=self._failure_count,
+                success_count=self._success_count,
+                last_failure_time=self._last_failure_time,
+                state_change_time=self._state_change_time
+            )
             
             await redis.hset(state_key, mapping=state_data)
             await redis.expire(state_key, 3600)  # Expire after 1 hour
@@ -125,34 +187,42 @@ class CircuitBreaker:
                 error=str(e)
             )
     
+    async def _schedule_state_save(self):
+        """Persist state to Redis in the background, off the response path."""
+        if len(self._pending_writes) >= MAX_PENDING_STATE_WRITES:
+            # Apply backpressure: wait for a pending write before queueing more
+            await asyncio.wait(self._pending_writes, return_when=asyncio.FIRST_COMPLETED)
+        
+        task = asyncio.create_task(self._save_state_to_redis())
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+    
     def _update_request_window(self, success: bool):
         """Update sliding window with request result."""
         current_time = time.time()
+        window = self._request_window
+        
+        # Limit window size (evict explicitly to keep the failure count in sync)
+        if len(window) == window.maxlen and not window.popleft()[1]:
+            self._window_failures -= 1
         
         # Add new request result
-        self._request_window.append({
-            'success': success,
-            'timestamp': current_time
-        })
+        window.append((current_time, success))
+        if not success:
+            self._window_failures += 1
         
         # Remove old entries outside sliding window
         cutoff_time = current_time - 60  # 1 minute window
-        self._request_window = [
-            req for req in self._request_window 
-            if req['timestamp'] > cutoff_time
-        ]
-        
-        # Limit window size
-        if len(self._request_window) > self.config.sliding_window_size:
-            self._request_window = self._request_window[-self.config.sliding_window_size:]
+        while window[0][0] <= cutoff_time:
+            if not window.popleft()[1]:
+                self._window_failures -= 1
     
     def _calculate_failure_rate(self) -> float:
         """Calculate failure rate in sliding window."""
         if not self._request_window:
             return 0.0
         
-        failures = sum(1 for req in self._request_window if not req['success'])
-        return failures / len(self._request_window)
+        return self._window_failures / len(self._request_window)
     
     @property
     def state(self) -> CircuitBreakerState:
@@ -169,16 +239,17 @@ class CircuitBreaker:
         # Load current state from Redis
         await self._load_state_from_redis()
         
-        current_time = time.time()
-        
+        return await self._can_execute_loaded(time.time())
+    
+    async def _can_execute_loaded(self, current_time: float) -> bool:
+        """Check if request can be executed using already-loaded state."""
         if self._state == CircuitBreakerState.CLOSED:
             return True
         
         elif self._state == CircuitBreakerState.OPEN:
             # Check if recovery timeout has passed
             if current_time - self._last_failure_time >= self.config.recovery_timeout:
-                await self._transition_to_half_open()
-                return True
+                return await self._transition_to_half_open()
             return False
         
         elif self._state == CircuitBreakerState.HALF_OPEN:
@@ -196,16 +267,16 @@ class CircuitBreaker:
             if self._success_count >= self.config.success_threshold:
                 await self._transition_to_closed()
             else:
-                await self._save_state_to_redis()
+                await self._schedule_state_save()
         
         elif self._state == CircuitBreakerState.CLOSED:
             # Reset failure count on success
             if self._failure_count > 0:
                 self._failure_count = 0
-                await self._save_state_to_redis()
+                await self._schedule_state_save()
         
         # Update metrics
-        metrics.record_circuit_breaker_event(self.config.service_name, "success")
+        self._record_event("success")
     
     async def record_failure(self):
         """Record a failed request."""
@@ -221,14 +292,14 @@ class CircuitBreaker:
             elif self._failure_count >= self.config.failure_threshold:
                 await self._transition_to_open()
             else:
-                await self._save_state_to_redis()
+                await self._schedule_state_save()
         
         elif self._state == CircuitBreakerState.HALF_OPEN:
             # Go back to open on any failure
             await self._transition_to_open()
         
         # Update metrics
-        metrics.record_circuit_breaker_event(self.config.service_name, "failure")
+        self._record_event("failure")
     
     async def _transition_to_open(self):
         """Transition to OPEN state."""
@@ -245,11 +316,34 @@ class CircuitBreaker:
             threshold=self.config.failure_threshold
         )
         
-        metrics.record_circuit_breaker_event(self.config.service_name, "opened")
-        metrics.set_circuit_breaker_state(self.config.service_name, "open")
+        self._record_event("opened")
+        self._set_state_metric("open")
     
-    async def _transition_to_half_open(self):
-        """Transition to HALF_OPEN state."""
+    async def _acquire_probe_lock(self) -> bool:
+        """Acquire the fleet-wide lock for the OPEN -> HALF_OPEN probe."""
+        try:
+            redis = await self._get_redis()
+            lock_key = f"circuit_breaker:{self.config.service_name}:probe_lock"
+            
+            return bool(await redis.set(
+                lock_key, "1", nx=True, ex=self.config.recovery_timeout
+            ))
+        
+        except Exception as e:
+            # Without Redis there is no fleet to coordinate with
+            logger.warning(
+                "Failed to acquire circuit breaker probe lock",
+                service=self.config.service_name,
+                error=str(e)
+            )
+            return True
+    
+    async def _transition_to_half_open(self) -> bool:
+        """Transition to HALF_OPEN state if this instance wins the probe lock."""
+        if not await self._acquire_probe_lock():
+            # Another replica is already probing the service; stay OPEN
+            return False
+        
         self._state = CircuitBreakerState.HALF_OPEN
         self._state_change_time = time.time()
         self._success_count = 0
@@ -261,8 +355,10 @@ class CircuitBreaker:
             service=self.config.service_name
         )
         
-        metrics.record_circuit_breaker_event(self.config.service_name, "half_opened")
-        metrics.set_circuit_breaker_state(self.config.service_name, "half_open")
+        self._record_event("half_opened")
+        self._set_state_metric("half_open")
+        
+        return True
     
     async def _transition_to_closed(self):
         """Transition to CLOSED state."""
@@ -278,12 +374,13 @@ class CircuitBreaker:
             service=self.config.service_name
         )
         
-        metrics.record_circuit_breaker_event(self.config.service_name, "closed")
-        metrics.set_circuit_breaker_state(self.config.service_name, "closed")
+        self._record_event("closed")
+        self._set_state_metric("closed")
     
-    async def get_status(self) -> Dict[str, Any]:
-        """Get circuit breaker status."""
-        await self._load_state_from_redis()
+    async def get_status(self, refresh: bool = True) -> Dict[str, Any]:
+        """Get circuit breaker status, optionally reloading state from Redis first."""
+        if refresh:
+            await self._load_state_from_redis()
         
         return {
             "service": self.config.service_name,
@@ -295,10 +392,39 @@ class CircuitBreaker:
             "recovery_timeout": self.config.recovery_timeout,
             "last_failure_time": self._last_failure_time,
             "state_change_time": self._state_change_time,
-            "can_execute": await self.can_execute()
+            "can_execute": await self._can_execute_loaded(time.time())
         }
 
 
+class _PrefixTrie:
+    """Character trie for longest-prefix lookup of path prefixes."""
+    
+    __slots__ = ("_root",)
+    
+    _VALUE = ""  # Child key marking a terminal node; never a path character
+    
+    def __init__(self):
+        self._root: Dict[str, Any] = {}
+    
+    def insert(self, prefix: str, value: str):
+        """Map a literal path prefix to a value."""
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[self._VALUE] = value
+    
+    def longest_prefix(self, path: str) -> Optional[str]:
+        """Return the value of the longest inserted prefix of path."""
+        node = self._root
+        match = node.get(self._VALUE)
+        for char in path:
+            node = node.get(char)
+            if node is None:
+                break
+            match = node.get(self._VALUE, match)
+        return match
+
+
 class CircuitBreakerMiddleware(BaseHTTPMiddleware):
     """Middleware for circuit breaker pattern implementation."""
     
@@ -306,6 +432,8 @@ class CircuitBreakerMiddleware(BaseHTTPMiddleware):
         super().__init__(app)
         self.settings = settings or get_settings()
         self.circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self._path_trie = _PrefixTrie()
+        self._wildcard_patterns: list = []  # (service_name, prefix, suffix)
         self._initialize_circuit_breakers()
     
     def _initialize_circuit_breakers(self):
@@ -343,6 +471,14 @@ class CircuitBreakerMiddleware(BaseHTTPMiddleware):
         for service_name, service_config in services.items():
             self.circuit_breakers[service_name] = CircuitBreaker(service_config["config"])
             
+            # Index path patterns: literals in the trie, wildcards checked on miss
+            for pattern in service_config["patterns"]:
+                if "*" not in pattern:
+                    self._path_trie.insert(pattern, service_name)
+                else:
+                    prefix, suffix = pattern.split("*", 1)
+                    self._wildcard_patterns.append((service_name, prefix, suffix))
+            
             # Initialize metrics
             metrics.set_circuit_breaker_state(service_name, "closed")
     
@@ -397,32 +533,16 @@ class CircuitBreakerMiddleware(BaseHTTPMiddleware):
     
     def _get_service_for_path(self, path: str) -> Optional[str]:
         """Determine which service a path belongs to."""
-        service_patterns = {
-            "ams": ["/api/v1/me", "/api/v1/agents/create", "/api/v1/agents/update", "/api/v1/agents/delete", "/api/v1/templates"],
-            "letta": ["/api/v1/letta"],
-            "litellm": ["/api/v1/agents/*/proxy"]
-        }
+        service_name = self._path_trie.longest_prefix(path)
+        if service_name is not None:
+            return service_name
         
-        for service_name, patterns in service_patterns.items():
-            for pattern in patterns:
-                if self._path_matches_pattern(path, pattern):
-                    return service_name
+        for service_name, prefix, suffix in self._wildcard_patterns:
+            if path.startswith(prefix) and path.endswith(suffix):
+                return service_name
         
         return None
     
-    def _path_matches_pattern(self, path: str, pattern: str) -> bool:
-        """Check if path matches pattern with wildcard support."""
-        if "*" not in pattern:
-            return path.startswith(pattern)
-        
-        # Simple wildcard matching
-        pattern_parts = pattern.split("*")
-        if len(pattern_parts) == 2:
-            prefix, suffix = pattern_parts
-            return path.startswith(prefix) and path.endswith(suffix)
-        
-        return False
-    
     async def get_circuit_breaker_status(self, service_name: str) -> Optional[Dict[str, Any]]:
         """Get status of a specific circuit breaker."""
         if service_name in self.circuit_breakers:
@@ -431,11 +551,33 @@ class CircuitBreakerMiddleware(BaseHTTPMiddleware):
     
     async def get_all_circuit_breaker_status(self) -> Dict[str, Dict[str, Any]]:
         """Get status of all circuit breakers."""
+        await self._bulk_load_states()
+        
         status = {}
         for service_name, circuit_breaker in self.circuit_breakers.items():
-            status[service_name] = await circuit_breaker.get_status()
+            status[service_name] = await circuit_breaker.get_status(refresh=False)
         return status
     
+    async def _bulk_load_states(self):
+        """Load state for every circuit breaker from Redis in one round-trip."""
+        try:
+            redis = await get_redis_client()
+            breakers = list(self.circuit_breakers.values())
+            
+            async with redis.pipeline(transaction=False) as pipe:
+                for circuit_breaker in breakers:
+                    pipe.hgetall(circuit_breaker.state_key)
+                results = await pipe.execute()
+            
+            for circuit_breaker, state_data in zip(breakers, results):
+                circuit_breaker._apply_state_data(state_data)
+        
+        except Exception as e:
+            logger.warning(
+                "Failed to bulk load circuit breaker states from Redis",
+                error=str(e)
+            )
+    
     async def reset_circuit_breaker(self, service_name: str) -> bool:
         """Reset a circuit breaker (admin function)."""
         if service_name in self.circuit_breakers:
@@ -2,17 +2,19 @@
 Redis-based rate limiting middleware with sliding window implementation.
 """
 
+import re
 import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
 from typing import Dict, Optional, Tuple
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import structlog
 
 from src.config.settings import get_settings
 from src.models.common import ErrorResponse, ErrorDetail, RateLimitInfo
-from src.utils.cache import get_redis_client
+from src.utils.cache import get_redis_client, ScriptBatcher
 from src.utils.metrics import metrics
 from src.utils.exceptions import RateLimitError
 from src.middleware.auth import get_current_user_id
@@ -41,8 +43,118 @@ RATE_LIMIT_CATEGORIES = {
     }
 }
 
+
+@dataclass(slots=True, frozen=True)
+class _RateLimitState:
+    """Outcome of a rate limit check, used internally to build headers.
+    
+    RateLimitInfo remains the API-facing model; this avoids pydantic
+    validation on every request.
+    """
+    limit: int
+    remaining: int
+    reset_time: int  # Unix epoch seconds
+    retry_after: Optional[int] = None
+
+
+def _rate_limit_key(prefix: str, category: str, user_id: str) -> str:
+    """Build a per-user rate limit key.
+    
+    The user ID is wrapped in a Redis Cluster hash tag so every key for one
+    user maps to the same slot and can be used together in one script.
+    """
+    return f"{prefix}:{category}:{{{user_id}}}"
+
+
+def _compile_category_pattern(categories: Dict[str, Dict]) -> "re.Pattern[str]":
+    """Compile category path patterns into one alternation keyed by group name.
+    
+    Literal patterns match as prefixes; ``prefix*suffix`` patterns match paths
+    that start with ``prefix`` and end with ``suffix``. Alternatives are tried
+    in declaration order, so the first matching category wins.
+    """
+    groups = []
+    for category, config in categories.items():
+        fragments = []
+        for pattern in config["paths"]:
+            if "*" in pattern:
+                prefix, suffix = pattern.split("*", 1)
+                fragments.append(rf"{re.escape(prefix)}.*{re.escape(suffix)}\Z")
+            else:
+                fragments.append(re.escape(pattern))
+        groups.append(f"(?P<{category}>{'|'.join(fragments)})")
+    return re.compile("|".join(groups))
+
+
+_CATEGORY_PATTERN = _compile_category_pattern(RATE_LIMIT_CATEGORIES)
+
+# Atomic sliding-window check over the hourly and burst windows.
+# Each window is a hash of fixed-size time buckets (field = bucket index,
+# value = request count), so memory is bounded by the number of buckets
+# rather than by the limit.
+# KEYS: window key, burst key
+# ARGV: now, window size, window bucket, burst window, burst bucket,
+#       limit, burst limit, pending
+# ``pending`` is the number of requests already admitted locally since the
+# last check; they are always recorded and included in the returned counts.
+# Returns {window count, burst count, oldest live window bucket or -1}; the
+# current request is only recorded when it is admitted.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+
+local function window_count(key, window, bucket)
+    local current = math.floor(now / bucket)
+    local first_live = current - math.floor(window / bucket) + 1
+    local fields = redis.call('HGETALL', key)
+    local total = 0
+    local oldest = -1
+    for i = 1, #fields, 2 do
+        local index = tonumber(fields[i])
+        if index < first_live then
+            redis.call('HDEL', key, fields[i])
+        else
+            total = total + tonumber(fields[i + 1])
+            if oldest < 0 or index < oldest then
+                oldest = index
+            end
+        end
+    end
+    return total, current, oldest
+end
+
+local window, window_bucket = tonumber(ARGV[2]), tonumber(ARGV[3])
+local burst_window, burst_bucket = tonumber(ARGV[4]), tonumber(ARGV[5])
+
+local count, current, oldest = window_count(KEYS[1], window, window_bucket)
+local burst_count, burst_current = window_count(KEYS[2], burst_window, burst_bucket)
+
+local pending = tonumber(ARGV[8])
+count = count + pending
+burst_count = burst_count + pending
+
+local recorded = pending
+if burst_count <= tonumber(ARGV[7]) and count + 1 < tonumber(ARGV[6]) then
+    recorded = recorded + 1
+end
+
+if recorded > 0 then
+    redis.call('HINCRBY', KEYS[1], current, recorded)
+    redis.call('HINCRBY', KEYS[2], burst_current, recorded)
+    redis.call('EXPIRE', KEYS[1], window + 60)
+    redis.call('EXPIRE', KEYS[2], burst_window + 60)
+end
+return {count, burst_count, oldest}
+"""
+
+# Per-process shadow cache: after a Redis check admits a request, up to
+# LOCAL_ALLOWANCE_MAX further requests within LOCAL_SYNC_INTERVAL seconds are
+# admitted locally and recorded in Redis on the next check.
+LOCAL_CACHE_SIZE = 100_000
+LOCAL_SYNC_INTERVAL = 1.0
+LOCAL_ALLOWANCE_MAX = 10
+
 # Exempt endpoints from rate limiting
-RATE_LIMIT_EXEMPT_PATHS = {
+RATE_LIMIT_EXEMPT_PATHS = frozenset({
     "/",
     "/health",
     "/ping",
@@ -52,212 +164,248 @@ RATE_LIMIT_EXEMPT_PATHS = {
     "/metrics",
     "/ui",              # Admin UI
     "/api/v1/admin"     # Admin API
-}
+})
+
+# Prefixes for str.startswith; "/" only exempts the root itself
+_EXEMPT_PREFIXES = tuple(path for path in RATE_LIMIT_EXEMPT_PATHS if path != "/")
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Redis-based rate limiting with sliding window algorithm."""
+class RateLimitMiddleware:
+    """Redis-based rate limiting with sliding window algorithm.
     
-    def __init__(self, app, settings=None):
-        super().__init__(app)
+    Implemented as plain ASGI middleware so exempt and non-HTTP traffic is
+    passed straight through without BaseHTTPMiddleware's response wrapping.
+    """
+    
+    window_size = 3600   # 1 hour in seconds
+    burst_window = 60    # 1 minute burst window
+    window_bucket = 60   # 1 minute buckets for the hourly window
+    burst_bucket = 1     # 1 second buckets for the burst window
+    
+    def __init__(self, app: ASGIApp, settings=None):
+        self.app = app
         self.settings = settings or get_settings()
-        self.window_size = 3600  # 1 hour in seconds
         self.redis_client = None
-        self.burst_window = 60   # 1 minute burst window
+        self._window_script = None
+        self._script_batcher = None
+        # (category, user_id) -> [allowance, synced_at, pending, remaining]
+        self._local_allowances: OrderedDict = OrderedDict()
+        
+        # Settings are fixed after load, so resolve per-category limits once
+        self._limits: Dict[str, int] = {
+            category: getattr(self.settings, config["limit_key"], 1000)
+            for category, config in RATE_LIMIT_CATEGORIES.items()
+        }
+        self._burst_limits: Dict[str, int] = {
+            category: config["burst_limit"]
+            for category, config in RATE_LIMIT_CATEGORIES.items()
+        }
+        
+        # Script arguments that only depend on the category
+        self._script_args: Dict[str, Tuple[int, ...]] = {
+            category: (
+                self.window_size, self.window_bucket,
+                self.burst_window, self.burst_bucket,
+                self._limits[category], self._burst_limits[category]
+            )
+            for category in RATE_LIMIT_CATEGORIES
+        }
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """Apply rate limiting to incoming requests."""
-        # Skip rate limiting if disabled
-        if not self.settings.enable_rate_limiting:
-            return await call_next(request)
+        # Skip rate limiting for non-HTTP traffic or when disabled
+        if scope["type"] != "http" or not self.settings.enable_rate_limiting:
+            await self.app(scope, receive, send)
+            return
+        
+        # Read the path straight from the ASGI scope (no URL object)
+        path = scope["path"]
         
         # Skip exempt paths
-        if self._is_exempt_path(request.url.path):
-            return await call_next(request)
+        if self._is_exempt_path(path):
+            await self.app(scope, receive, send)
+            return
+        
+        request = Request(scope)
         
         try:
-            # Get rate limit info
-            rate_limit_info = await self._check_rate_limit(request)
-            
-            if rate_limit_info.remaining <= 0:
-                # Rate limit exceeded
-                metrics.record_rate_limit_hit(
-                    user_id=self._get_user_identifier(request),
-                    endpoint=request.url.path
-                )
-                
-                raise RateLimitError(
-                    "Rate limit exceeded",
-                    retry_after=rate_limit_info.retry_after,
-                    context={
-                        "limit": rate_limit_info.limit,
-                        "remaining": rate_limit_info.remaining,
-                        "reset_time": rate_limit_info.reset_time.isoformat(),
-                        "retry_after": rate_limit_info.retry_after
-                    }
-                )
+            # Resolve the caller once for both the check and the metrics
+            user_id = self._get_user_identifier(request)
             
-            # Continue with request
-            response = await call_next(request)
-            
-            # Add rate limit headers to response
-            self._add_rate_limit_headers(response, rate_limit_info)
-            
-            return response
-            
-        except RateLimitError as e:
-            return JSONResponse(
-                status_code=e.status_code,
-                content=ErrorResponse(
-                    message=e.message,
-                    request_id=getattr(request.state, 'request_id', None),
-                    error=ErrorDetail(
-                        code=e.code,
-                        message=e.message,
-                        context=e.context
-                    )
-                ).dict(exclude_none=True),
-                headers={
-                    "Retry-After": str(e.context.get("retry_after", 60)),
-                    "X-RateLimit-Limit": str(e.context.get("limit", 0)),
-                    "X-RateLimit-Remaining": "0",
-                    "X-RateLimit-Reset": e.context.get("reset_time", "")
-                }
-            )
+            # Get rate limit info
+            rate_limit_info = await self._check_rate_limit(path, user_id)
         
         except Exception as e:
             logger.error("Rate limiting error", error=str(e), exc_info=True)
             # Continue without rate limiting on error
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
+        
+        if rate_limit_info.remaining <= 0:
+            # Rate limit exceeded
+            metrics.record_rate_limit_hit(
+                user_id=user_id,
+                endpoint=path
+            )
+            
+            response = self._rate_limit_exceeded_response(request, rate_limit_info)
+            await response(scope, receive, send)
+            return
+        
+        async def send_with_rate_limit_headers(message: Message):
+            if message["type"] == "http.response.start":
+                self._add_rate_limit_headers(message, rate_limit_info)
+            await send(message)
+        
+        # Continue with request
+        await self.app(scope, receive, send_with_rate_limit_headers)
+    
+    def _rate_limit_exceeded_response(self, request: Request, rate_limit_info: _RateLimitState) -> Response:
+        """Build the 429 response for a rejected request."""
+        e = RateLimitError(
+            "Rate limit exceeded",
+            retry_after=rate_limit_info.retry_after,
+            context={
+                "limit": rate_limit_info.limit,
+                "remaining": rate_limit_info.remaining,
+                "reset_time": datetime.fromtimestamp(
+                    rate_limit_info.reset_time, tz=timezone.utc
+                ).isoformat(),
+                "retry_after": rate_limit_info.retry_after
+            }
+        )
+        
+        error_response = ErrorResponse(
+            message=e.message,
+            request_id=getattr(request.state, 'request_id', None),
+            error=ErrorDetail(
+                code=e.code,
+                message=e.message,
+                context=e.context
+            )
+        )
+        
+        # Serialize straight to JSON bytes via pydantic-core
+        return Response(
+            content=error_response.model_dump_json(exclude_none=True),
+            status_code=e.status_code,
+            media_type="application/json",
+            headers={
+                "Retry-After": str(e.context.get("retry_after", 60)),
+                "X-RateLimit-Limit": str(e.context.get("limit", 0)),
+                "X-RateLimit-Remaining": "0",
+                "X-RateLimit-Reset": str(rate_limit_info.reset_time)
+            }
+        )
     
     def _is_exempt_path(self, path: str) -> bool:
         """Check if path is exempt from rate limiting."""
-        return any(path.startswith(exempt_path) or path == exempt_path 
-                  for exempt_path in RATE_LIMIT_EXEMPT_PATHS)
+        return path in RATE_LIMIT_EXEMPT_PATHS or path.startswith(_EXEMPT_PREFIXES)
     
     def _get_user_identifier(self, request: Request) -> str:
         """Get user identifier for rate limiting."""
+        # Cheapest first: a user ID already resolved by authentication
+        user_id = getattr(request.state, 'user_id', None)
+        if user_id:
+            return user_id
+        
         try:
             # Try to get authenticated user ID
             return get_current_user_id(request)
         except Exception:
             # Fall back to IP address for unauthenticated requests
-            client_ip = request.client.host if request.client else "unknown"
-            return f"ip:{client_ip}"
+            client = request.scope.get("client")
+            return f"ip:{client[0] if client else 'unknown'}"
     
     def _get_rate_limit_category(self, path: str) -> str:
         """Determine rate limit category for the path."""
-        for category, config in RATE_LIMIT_CATEGORIES.items():
-            for pattern in config["paths"]:
-                if self._path_matches_pattern(path, pattern):
-                    return category
-        
-        return "general"  # Default category
-    
-    def _path_matches_pattern(self, path: str, pattern: str) -> bool:
-        """Check if path matches pattern with wildcard support."""
-        if "*" not in pattern:
-            return path.startswith(pattern)
-        
-        # Simple wildcard matching
-        pattern_parts = pattern.split("*")
-        if len(pattern_parts) == 2:
-            prefix, suffix = pattern_parts
-            return path.startswith(prefix) and path.endswith(suffix)
-        
-        return False
+        match = _CATEGORY_PATTERN.match(path)
+        return match.lastgroup if match else "general"  # Default category
     
     def _get_rate_limit_for_category(self, category: str) -> int:
         """Get rate limit value for category."""
-        if category not in RATE_LIMIT_CATEGORIES:
-            category = "general"
-        
-        limit_key = RATE_LIMIT_CATEGORIES[category]["limit_key"]
-        return getattr(self.settings, limit_key, 1000)
+        return self._limits.get(category, self._limits["general"])
     
     def _get_burst_limit_for_category(self, category: str) -> int:
         """Get burst limit value for category."""
-        if category not in RATE_LIMIT_CATEGORIES:
-            category = "general"
-        
-        return RATE_LIMIT_CATEGORIES[category]["burst_limit"]
+        return self._burst_limits.get(category, self._burst_limits["general"])
     
-    async def _check_rate_limit(self, request: Request) -> RateLimitInfo:
+    async def _check_rate_limit(self, path: str, user_id: str) -> _RateLimitState:
         """Check rate limit using sliding window algorithm."""
-        user_id = self._get_user_identifier(request)
-        category = self._get_rate_limit_category(request.url.path)
+        category = self._get_rate_limit_category(path)
         limit = self._get_rate_limit_for_category(category)
         burst_limit = self._get_burst_limit_for_category(category)
         
         # Create Redis keys
-        redis_key = f"rate_limit:{category}:{user_id}"
-        burst_key = f"rate_limit_burst:{category}:{user_id}"
+        redis_key = _rate_limit_key("rate_limit", category, user_id)
+        burst_key = _rate_limit_key("rate_limit_burst", category, user_id)
         
-        # Get current time
+        # Get current time and window bounds
         now = time.time()
-        window_start = now - self.window_size
-        burst_start = now - self.burst_window
+        window = self.window_size
+        reset_time = int(now) + window
+        
+        # Admit locally while the last Redis check left allowance
+        local_key = (category, user_id)
+        entry = self._local_allowances.get(local_key)
+        if entry is not None and entry[0] > 0 and now - entry[1] < LOCAL_SYNC_INTERVAL:
+            entry[0] -= 1
+            entry[2] += 1
+            return _RateLimitState(
+                limit=limit,
+                remaining=entry[3] - entry[2],
+                reset_time=reset_time,
+                retry_after=None
+            )
+        # Claim the locally admitted requests before awaiting, so concurrent
+        # checks for the same key don't report them to Redis again
+        pending = 0
+        if entry is not None:
+            pending, entry[2] = entry[2], 0
         
         # Get Redis client
         if self.redis_client is None:
             self.redis_client = await get_redis_client()
+            self._window_script = self.redis_client.register_script(SLIDING_WINDOW_SCRIPT)
+            self._script_batcher = ScriptBatcher(self.redis_client, self._window_script)
         
         try:
-            # Use Redis pipeline for atomic operations
-            async with self.redis_client.pipeline() as pipe:
-                # Remove old entries outside the window
-                await pipe.zremrangebyscore(redis_key, 0, window_start)
-                await pipe.zremrangebyscore(burst_key, 0, burst_start)
-                
-                # Count current requests in both windows
-                await pipe.zcard(redis_key)
-                await pipe.zcard(burst_key)
-                
-                # Add current request to both windows
-                await pipe.zadd(redis_key, {str(now): now})
-                await pipe.zadd(burst_key, {str(now): now})
-                
-                # Set expiry for the keys
-                await pipe.expire(redis_key, self.window_size + 60)
-                await pipe.expire(burst_key, self.burst_window + 60)
-                
-                # Execute pipeline
-                results = await pipe.execute()
-                
-                current_count = results[2]  # Count after removing old entries
-                burst_count = results[3]    # Burst count
+            # Trim, count and record atomically (EVALSHA), pipelined with
+            # concurrent checks issued in the same event-loop tick
+            current_count, burst_count, oldest_bucket = await self._script_batcher.submit(
+                keys=(redis_key, burst_key),
+                args=(now, *self._script_args[category], pending)
+            )
             
             # Check burst limit first
             if burst_count > burst_limit:
+                self._update_local_allowance(local_key, now, 0, 0)
                 # Burst limit exceeded
-                return RateLimitInfo(
+                return _RateLimitState(
                     limit=limit,
                     remaining=0,
-                    reset_time=datetime.fromtimestamp(now + self.burst_window).isoformat(),
-                    retry_after=int(self.burst_window)
+                    reset_time=int(now) + self.burst_window,
+                    retry_after=self.burst_window
                 )
             
             # Calculate remaining requests
             remaining = max(0, limit - current_count - 1)  # -1 for current request
             
-            # Calculate reset time (next window)
-            reset_time = datetime.fromtimestamp(now + self.window_size).isoformat()
-            
             # Calculate retry after (time until window slides enough)
             if remaining <= 0:
-                # Find the oldest request in current window
-                oldest_requests = await self.redis_client.zrange(
-                    redis_key, 0, 0, withscores=True
-                )
-                
-                if oldest_requests:
-                    oldest_timestamp = oldest_requests[0][1]
-                    retry_after = int(oldest_timestamp + self.window_size - now) + 1
+                # Oldest live bucket in current window, returned by the script
+                if oldest_bucket >= 0:
+                    bucket_expiry = oldest_bucket * self.window_bucket + window
+                    retry_after = int(bucket_expiry - now) + 1
                 else:
                     retry_after = 60  # Default retry after
             else:
                 retry_after = None
             
+            self._update_local_allowance(
+                local_key, now, remaining, burst_limit - burst_count
+            )
+            
             logger.debug(
                 "Rate limit check",
                 user_id=user_id,
@@ -267,7 +415,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 remaining=remaining
             )
             
-            return RateLimitInfo(
+            return _RateLimitState(
                 limit=limit,
                 remaining=remaining,
                 reset_time=reset_time,
@@ -277,22 +425,68 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         except Exception as e:
             logger.error("Redis rate limit check failed", error=str(e))
             
+            # The claimed requests were never recorded; report them next time
+            self._requeue_pending(local_key, pending)
+            
             # Return permissive rate limit info on Redis failure
-            return RateLimitInfo(
+            return _RateLimitState(
                 limit=limit,
                 remaining=limit - 1,
-                reset_time=datetime.fromtimestamp(now + self.window_size).isoformat(),
+                reset_time=reset_time,
                 retry_after=None
             )
     
-    def _add_rate_limit_headers(self, response: Response, rate_limit_info: RateLimitInfo):
-        """Add rate limit headers to response."""
-        response.headers["X-RateLimit-Limit"] = str(rate_limit_info.limit)
-        response.headers["X-RateLimit-Remaining"] = str(rate_limit_info.remaining)
-        response.headers["X-RateLimit-Reset"] = str(int(rate_limit_info.reset_time.timestamp()))
+    def _update_local_allowance(self, local_key: Tuple[str, str], now: float, remaining: int, burst_headroom: int):
+        """Reseed the local allowance from a fresh Redis check.
         
-        if rate_limit_info.retry_after:
-            response.headers["Retry-After"] = str(rate_limit_info.retry_after)
+        Requests admitted locally while the check was in flight are not in the
+        Redis counts yet, so they are carried over as pending.
+        """
+        entry = self._local_allowances.get(local_key)
+        unreported = entry[2] if entry is not None else 0
+        
+        allowance = min(LOCAL_ALLOWANCE_MAX, remaining - 1, burst_headroom) - unreported
+        if remaining <= 0 or allowance <= 0:
+            self._local_allowances.pop(local_key, None)
+            self._requeue_pending(local_key, unreported)
+            return
+        
+        self._local_allowances[local_key] = [allowance, now, unreported, remaining]
+        self._local_allowances.move_to_end(local_key)
+        if len(self._local_allowances) > LOCAL_CACHE_SIZE:
+            self._local_allowances.popitem(last=False)
+    
+    def _requeue_pending(self, local_key: Tuple[str, str], pending: int):
+        """Keep unreported local admissions so the next Redis check records them."""
+        if pending <= 0:
+            return
+        
+        entry = self._local_allowances.get(local_key)
+        if entry is not None:
+            entry[2] += pending
+            return
+        
+        # No allowance left: the next request for this key goes to Redis
+        self._local_allowances[local_key] = [0, 0.0, pending, 0]
+        self._local_allowances.move_to_end(local_key)
+        if len(self._local_allowances) > LOCAL_CACHE_SIZE:
+            self._local_allowances.popitem(last=False)
+    
+    def _add_rate_limit_headers(self, message: Message, rate_limit_info: _RateLimitState):
+        """Append rate limit headers to an http.response.start message."""
+        headers = message.setdefault("headers", [])
+        if not isinstance(headers, list):
+            headers = message["headers"] = list(headers)
+        
+        # Extend the raw header list once rather than setting each header
+        headers.extend((
+            (b"x-ratelimit-limit", str(rate_limit_info.limit).encode()),
+            (b"x-ratelimit-remaining", str(rate_limit_info.remaining).encode()),
+            (b"x-ratelimit-reset", str(rate_limit_info.reset_time).encode()),
+        ))
+        
+        if rate_limit_info.retry_after is not None:
+            headers.append((b"retry-after", str(rate_limit_info.retry_after).encode()))
 
 
 class RateLimitManager:
@@ -310,25 +504,27 @@ class RateLimitManager:
     
     async def get_rate_limit_status(self, user_id: str, category: str = "general") -> RateLimitInfo:
         """Get current rate limit status for user."""
-        redis_key = f"rate_limit:{category}:{user_id}"
+        redis_key = _rate_limit_key("rate_limit", category, user_id)
         limit = self._get_limit_for_category(category)
         
         now = time.time()
-        window_start = now - 3600  # 1 hour window
+        window = RateLimitMiddleware.window_size
+        window_bucket = RateLimitMiddleware.window_bucket
         
         try:
             redis = await self._get_redis()
             
-            # Remove old entries and count current
-            async with redis.pipeline() as pipe:
-                await pipe.zremrangebyscore(redis_key, 0, window_start)
-                await pipe.zcard(redis_key)
-                results = await pipe.execute()
-                
-                current_count = results[1]
+            # Sum the buckets still inside the window, bounded the same way
+            # as in SLIDING_WINDOW_SCRIPT
+            first_live = int(now // window_bucket) - window // window_bucket + 1
+            buckets = await redis.hgetall(redis_key)
+            current_count = sum(
+                int(count) for index, count in buckets.items()
+                if int(index) >= first_live
+            )
             
             remaining = max(0, limit - current_count)
-            reset_time = datetime.fromtimestamp(now + 3600).isoformat()
+            reset_time = int(now) + window
             
             return RateLimitInfo(
                 limit=limit,
@@ -344,13 +540,13 @@ class RateLimitManager:
             return RateLimitInfo(
                 limit=limit,
                 remaining=limit,
-                reset_time=datetime.fromtimestamp(now + 3600).isoformat(),
+                reset_time=int(now) + window,
                 retry_after=None
             )
     
     async def reset_rate_limit(self, user_id: str, category: str = "general") -> bool:
         """Reset rate limit for user (admin function)."""
-        redis_key = f"rate_limit:{category}:{user_id}"
+        redis_key = _rate_limit_key("rate_limit", category, user_id)
         
         try:
             redis = await self._get_redis()
@@ -376,7 +572,7 @@ class RateLimitManager:
         duration: int = 3600
     ) -> bool:
         """Set custom rate limit for user."""
-        redis_key = f"rate_limit_custom:{category}:{user_id}"
+        redis_key = _rate_limit_key("rate_limit_custom", category, user_id)
         
         try:
             redis = await self._get_redis()
@@ -409,24 +605,24 @@ class RateLimitManager:
         try:
             redis = await self._get_redis()
             
-            # Get all rate limit keys
-            keys = await redis.keys("rate_limit:*")
+            # Walk rate limit keys incrementally instead of blocking on KEYS
+            users = set()
+            categories: Dict[str, int] = defaultdict(int)
+            active_limits = 0
+            
+            async for key in redis.scan_iter(match="rate_limit:*", count=1000):
+                active_limits += 1
+                parts = key.split(":", 2)
+                if len(parts) == 3:
+                    users.add(parts[2].strip("{}"))
+                    categories[parts[1]] += 1
             
             stats = {
-                "total_users": len(set(key.split(":")[-1] for key in keys)),
-                "categories": {},
-                "active_limits": len(keys)
+                "total_users": len(users),
+                "categories": dict(categories),
+                "active_limits": active_limits
             }
             
-            # Count by category
-            for key in keys:
-                parts = key.split(":")
-                if len(parts) >= 3:
-                    category = parts[1]
-                    if category not in stats["categories"]:
-                        stats["categories"][category] = 0
-                    stats["categories"][category] += 1
-            
             return stats
             
         except Exception as e:
@@ -2,10 +2,36 @@
 Common Pydantic models used across the application.
 """
 
+import re
+import time
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
-from pydantic import BaseModel, Field, validator, ConfigDict
+from typing import Any, Dict, List, Literal, Optional, Union, get_args
+from pydantic import BaseModel, Field, field_validator, ConfigDict
+
+
+_IDEMPOTENCY_KEY_PATTERN = re.compile(r"\A[A-Za-z0-9_-]+\Z")
+
+# Extended list of supported message roles for AI platforms
+MessageRole = Literal[
+    "user", "assistant", "system",  # Standard OpenAI roles
+    "function", "tool", "function_call",  # Function calling roles
+    "human", "ai", "bot",  # Alternative naming conventions
+    "persona", "memory", "context"  # Letta-specific roles
+]
+ALLOWED_ROLES = frozenset(get_args(MessageRole))
+
+
+def _utc_timestamp() -> str:
+    """Current UTC time in ISO 8601 format, without building a datetime."""
+    now = time.time()
+    seconds = int(now)
+    tm = time.gmtime(seconds)
+    return (
+        f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}"
+        f"T{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}"
+        f".{int((now - seconds) * 1_000_000):06d}"
+    )
 
 
 class ResponseStatus(str, Enum):
@@ -29,7 +55,7 @@ class BaseResponse(BaseModel):
     
     status: ResponseStatus
     message: Optional[str] = None
-    timestamp: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
+    timestamp: str = Field(default_factory=_utc_timestamp)
     request_id: Optional[str] = None
 
 
@@ -46,8 +72,8 @@ class ErrorResponse(BaseResponse):
     status: ResponseStatus = ResponseStatus.ERROR
     error: ErrorDetail
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "status": "error",
                 "message": "Validation failed",
@@ -61,6 +87,7 @@ class ErrorResponse(BaseResponse):
                 }
             }
         }
+    )
 
 
 class SuccessResponse(BaseResponse):
@@ -68,8 +95,8 @@ class SuccessResponse(BaseResponse):
     status: ResponseStatus = ResponseStatus.SUCCESS
     data: Optional[Any] = None
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "status": "success",
                 "message": "Operation completed successfully",
@@ -78,6 +105,7 @@ class SuccessResponse(BaseResponse):
                 "data": {}
             }
         }
+    )
 
 
 class PaginationParams(BaseModel):
@@ -130,8 +158,8 @@ class UserContext(BaseModel):
     role: Optional[str] = Field(None, description="User role")
     metadata: Optional[Dict[str, Any]] = Field(None, description="Additional user metadata")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "user_id": "user_123456789",
                 "email": "user@example.com",
@@ -142,6 +170,7 @@ class UserContext(BaseModel):
                 }
             }
         }
+    )
 
 
 class ServiceHealth(BaseModel):
@@ -151,10 +180,10 @@ class ServiceHealth(BaseModel):
     url: str = Field(..., description="Service URL")
     response_time_ms: Optional[float] = Field(None, description="Response time in milliseconds")
     error: Optional[str] = Field(None, description="Error message if unhealthy")
-    last_check: str = Field(default_factory=lambda: datetime.utcnow().isoformat(), description="Last health check time")
+    last_check: str = Field(default_factory=_utc_timestamp, description="Last health check time")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "name": "AMS",
                 "status": "healthy",
@@ -164,35 +193,37 @@ class ServiceHealth(BaseModel):
                 "last_check": "2025-09-21T05:09:00Z"
             }
         }
+    )
 
 
 class RateLimitInfo(BaseModel):
     """Rate limit information."""
     limit: int = Field(..., description="Rate limit threshold")
     remaining: int = Field(..., description="Remaining requests")
-    reset_time: str = Field(..., description="When the rate limit resets")
+    reset_time: int = Field(..., description="When the rate limit resets (Unix epoch seconds)")
     retry_after: Optional[int] = Field(None, description="Seconds to wait before retry")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "limit": 1000,
                 "remaining": 750,
-                "reset_time": "2025-09-21T06:00:00Z",
+                "reset_time": 1758434400,
                 "retry_after": None
             }
         }
+    )
 
 
 class IdempotencyKey(BaseModel):
     """Idempotency key for safe retries."""
     key: str = Field(..., min_length=1, max_length=255, description="Unique idempotency key")
     
-    @validator('key')
-    def validate_key_format(cls, v):
+    @field_validator('key')
+    @classmethod
+    def validate_key_format(cls, v: str) -> str:
         """Validate idempotency key format."""
-        import re
-        if not re.match(r'^[a-zA-Z0-9_-]+$', v):
+        if not _IDEMPOTENCY_KEY_PATTERN.match(v):
             raise ValueError("Idempotency key must contain only alphanumeric characters, hyphens, and underscores")
         return v
 
@@ -204,8 +235,8 @@ class RequestMetadata(BaseModel):
     correlation_id: Optional[str] = Field(None, description="Request correlation ID")
     idempotency_key: Optional[str] = Field(None, description="Idempotency key for safe retries")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "user_agent": "Mozilla/5.0 (compatible; AI-Agent-Client/1.0)",
                 "client_ip": "192.168.1.100",
@@ -213,3 +244,4 @@ class RequestMetadata(BaseModel):
                 "idempotency_key": "idem_987654321"
             }
         }
+    )
@@ -2,10 +2,23 @@
 Request models for all API endpoints.
 """
 
+import functools
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
-from pydantic import BaseModel, Field, validator, AnyHttpUrl
-import json
+from typing import Any, Dict, List, Literal, Optional, Union
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, model_validator
+import orjson
+import yaml
+
+from .common import MessageRole
+
+# Prefer the libyaml-backed loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+TEMPLATE_PARSE_CACHE_SIZE = 256
+
+MemoryType = Literal["core", "recall", "archival", "persona"]
+MemoryOperation = Literal["update", "append", "replace", "delete"]
+TemplateFormat = Literal["yaml", "json"]
 
 
 class CreateAgentRequest(BaseModel):
@@ -22,15 +35,16 @@ class CreateAgentRequest(BaseModel):
     config: Optional[Dict[str, Any]] = Field(None, description="Agent configuration (not used by AMS)")
     metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata (not used by AMS)")
     
-    @validator('name', pre=True, always=True)
-    def handle_legacy_name_field(cls, v, values):
+    @model_validator(mode='before')
+    @classmethod
+    def handle_legacy_name_field(cls, data: Any) -> Any:
         """Handle backward compatibility for name field."""
-        if v and not values.get('agent_name'):
-            values['agent_name'] = v
-        return v
+        if isinstance(data, dict) and data.get('name') and not data.get('agent_name'):
+            data = {**data, 'agent_name': data['name']}
+        return data
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "template_id": "test-bot",
                 "use_latest": True,
@@ -40,6 +54,7 @@ class CreateAgentRequest(BaseModel):
                 }
             }
         }
+    )
 
 
 class UpgradeAgentRequest(BaseModel):
@@ -54,8 +69,8 @@ class UpgradeAgentRequest(BaseModel):
     backup_current: bool = Field(True, description="Whether to backup current agent state (not used by AMS)")
     config_updates: Optional[Dict[str, Any]] = Field(None, description="Configuration updates to apply (not used by AMS)")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "target_version": "2.0.0",
                 "use_latest": False,
@@ -63,32 +78,19 @@ class UpgradeAgentRequest(BaseModel):
                 "use_queue": False
             }
         }
+    )
 
 
 class SendMessageRequest(BaseModel):
     """Request model for sending a message to a Letta agent."""
     message: str = Field(..., min_length=1, max_length=10000, description="Message content")
-    role: str = Field("user", description="Message role (user, system, assistant, function, tool, human, ai, persona, memory, context)")
+    role: MessageRole = Field("user", description="Message role (user, system, assistant, function, tool, human, ai, persona, memory, context)")
     stream: bool = Field(False, description="Whether to stream the response")
     include_metadata: bool = Field(True, description="Whether to include response metadata")
     context: Optional[Dict[str, Any]] = Field(None, description="Additional context for the message")
     
-    @validator('role')
-    def validate_role(cls, v):
-        """Validate message role."""
-        # Extended list of supported message roles for AI platforms
-        allowed_roles = [
-            "user", "assistant", "system",  # Standard OpenAI roles
-            "function", "tool", "function_call",  # Function calling roles
-            "human", "ai", "bot",  # Alternative naming conventions
-            "persona", "memory", "context"  # Letta-specific roles
-        ]
-        if v not in allowed_roles:
-            raise ValueError(f"Role must be one of: {allowed_roles}")
-        return v
-    
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "message": "Hello, can you help me with my account?",
                 "role": "user",
@@ -100,38 +102,24 @@ class SendMessageRequest(BaseModel):
                 }
             }
         }
+    )
 
 
 class UpdateMemoryRequest(BaseModel):
     """Request model for updating agent memory."""
-    memory_type: str = Field(..., description="Type of memory to update")
+    memory_type: MemoryType = Field(..., description="Type of memory to update")
     content: Union[str, Dict[str, Any]] = Field(..., description="Memory content")
-    operation: str = Field("update", description="Operation type (update, append, replace)")
+    operation: MemoryOperation = Field("update", description="Operation type (update, append, replace)")
     
-    @validator('memory_type')
-    def validate_memory_type(cls, v):
-        """Validate memory type."""
-        allowed_types = ["core", "recall", "archival", "persona"]
-        if v not in allowed_types:
-            raise ValueError(f"Memory type must be one of: {allowed_types}")
-        return v
-    
-    @validator('operation')
-    def validate_operation(cls, v):
-        """Validate operation type."""
-        allowed_operations = ["update", "append", "replace", "delete"]
-        if v not in allowed_operations:
-            raise ValueError(f"Operation must be one of: {allowed_operations}")
-        return v
-    
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "memory_type": "core",
                 "content": "User prefers concise responses and technical details",
                 "operation": "update"
             }
         }
+    )
 
 
 class ArchivalMemoryRequest(BaseModel):
@@ -141,8 +129,8 @@ class ArchivalMemoryRequest(BaseModel):
     importance: Optional[int] = Field(None, ge=1, le=10, description="Importance level (1-10)")
     metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "content": "User mentioned they work in healthcare and prefer HIPAA-compliant solutions",
                 "tags": ["healthcare", "compliance", "preferences"],
@@ -153,51 +141,66 @@ class ArchivalMemoryRequest(BaseModel):
                 }
             }
         }
+    )
+
+
+@functools.lru_cache(maxsize=TEMPLATE_PARSE_CACHE_SIZE)
+def _parse_template(template_format: str, content: str) -> Any:
+    """Parse template content, caching results for repeated submissions."""
+    if template_format == "json":
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON content: {e}")
+    try:
+        return yaml.load(content, Loader=_YAML_LOADER)
+    except Exception as e:
+        raise ValueError(f"Invalid YAML content: {e}")
 
 
 class TemplateValidationRequest(BaseModel):
     """Request model for template validation."""
     template_content: Union[str, Dict[str, Any]] = Field(..., description="Template content to validate")
-    template_format: str = Field("yaml", description="Template format (yaml, json)")
+    template_format: TemplateFormat = Field("yaml", description="Template format (yaml, json)")
     strict_validation: bool = Field(True, description="Whether to perform strict validation")
     
-    @validator('template_format')
-    def validate_format(cls, v):
-        """Validate template format."""
-        allowed_formats = ["yaml", "json"]
-        if v not in allowed_formats:
-            raise ValueError(f"Template format must be one of: {allowed_formats}")
-        return v
+    _parsed: Any = PrivateAttr(default=None)
+    
+    @property
+    def parsed(self) -> Any:
+        """
+        Parsed template content.
+        
+        String content is parsed once during validation; the result may be
+        shared with other requests for the same template, so treat it as
+        read-only.
+        """
+        return self._parsed
     
-    @validator('template_content')
-    def validate_content(cls, v, values):
+    @model_validator(mode='after')
+    def validate_content(self) -> 'TemplateValidationRequest':
         """Validate template content based on format."""
-        template_format = values.get('template_format', 'yaml')
+        # Runs after field validation so template_format, which is declared
+        # after template_content, is available here.
+        v = self.template_content
         
         if isinstance(v, str):
             # Validate string content can be parsed
-            if template_format == "json":
-                try:
-                    json.loads(v)
-                except json.JSONDecodeError as e:
-                    raise ValueError(f"Invalid JSON content: {e}")
-            elif template_format == "yaml":
-                try:
-                    import yaml
-                    yaml.safe_load(v)
-                except Exception as e:
-                    raise ValueError(f"Invalid YAML content: {e}")
+            self._parsed = _parse_template(self.template_format, v)
+        else:
+            self._parsed = v
         
-        return v
+        return self
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "template_content": "name: Support Agent\ndescription: Customer support template\nconfig:\n  model: gpt-4\n  temperature: 0.7",
                 "template_format": "yaml",
                 "strict_validation": True
             }
         }
+    )
 
 
 class PublishTemplateRequest(BaseModel):
@@ -208,8 +211,8 @@ class PublishTemplateRequest(BaseModel):
     changelog: Optional[str] = Field(None, description="Changelog for this version")
     tags: Optional[List[str]] = Field(None, description="Tags for categorization")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "template_id": "template_123",
                 "version": "1.0.0",
@@ -218,51 +221,39 @@ class PublishTemplateRequest(BaseModel):
                 "tags": ["support", "customer-service", "general"]
             }
         }
+    )
+
+
+class ChatMessage(BaseModel):
+    """Single chat message in an LLM proxy request."""
+    role: MessageRole = Field(..., description="Message role")
+    content: Optional[str] = Field(None, description="Message content")
+    tool_calls: Optional[List[Dict[str, Any]]] = Field(None, description="Tool calls made by the assistant")
+    name: Optional[str] = Field(None, description="Name of the author or function")
+    
+    # Provider-specific keys (tool_call_id, function_call, ...) pass through
+    model_config = ConfigDict(extra='allow')
+    
+    @model_validator(mode='after')
+    def validate_content_or_tool_calls(self) -> 'ChatMessage':
+        """Content or tool_calls should be present (but allow empty content for some roles)."""
+        fields_set = self.model_fields_set
+        if 'content' not in fields_set and 'tool_calls' not in fields_set:
+            raise ValueError("Each message must have either 'content' or 'tool_calls' field")
+        return self
 
 
 class LLMProxyRequest(BaseModel):
     """Request model for LLM proxy operations."""
     model: str = Field(..., description="LLM model to use")
-    messages: List[Dict[str, Any]] = Field(..., description="Chat messages")
+    messages: List[ChatMessage] = Field(..., min_length=1, description="Chat messages")
     temperature: Optional[float] = Field(None, ge=0.0, le=2.0, description="Sampling temperature")
     max_tokens: Optional[int] = Field(None, ge=1, le=8000, description="Maximum tokens to generate")
     stream: bool = Field(False, description="Whether to stream the response")
     user_context: Optional[Dict[str, Any]] = Field(None, description="User context for billing")
     
-    @validator('messages')
-    def validate_messages(cls, v):
-        """Validate message format."""
-        if not v:
-            raise ValueError("Messages cannot be empty")
-        
-        # Extended list of supported message roles for AI platforms
-        allowed_roles = [
-            "user", "assistant", "system",  # Standard OpenAI roles
-            "function", "tool", "function_call",  # Function calling roles
-            "human", "ai", "bot",  # Alternative naming conventions
-            "persona", "memory", "context"  # Letta-specific roles
-        ]
-        
-        for msg in v:
-            if not isinstance(msg, dict):
-                raise ValueError("Each message must be a dictionary")
-            if "role" not in msg:
-                raise ValueError("Each message must have 'role' field")
-            if msg["role"] not in allowed_roles:
-                raise ValueError(f"Message role must be one of: {allowed_roles}")
-            
-            # Content or tool_calls should be present (but allow empty content for some roles)
-            if "content" not in msg and "tool_calls" not in msg:
-                raise ValueError("Each message must have either 'content' or 'tool_calls' field")
-            
-            # If content is present, it should be a string or None
-            if "content" in msg and msg["content"] is not None and not isinstance(msg["content"], str):
-                raise ValueError("Message content must be a string or None")
-        
-        return v
-    
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "model": "gpt-4",
                 "messages": [
@@ -278,23 +269,19 @@ class LLMProxyRequest(BaseModel):
                 }
             }
         }
+    )
 
 
 class BulkOperationRequest(BaseModel):
     """Request model for bulk operations."""
     operation: str = Field(..., description="Operation type")
-    items: List[Dict[str, Any]] = Field(..., min_items=1, max_items=100, description="Items to process")
+    # Items are only length-checked here; each operation handler validates
+    # its own item shape when it consumes them
+    items: List[Any] = Field(..., min_length=1, max_length=100, description="Items to process")
     options: Optional[Dict[str, Any]] = Field(None, description="Operation options")
     
-    @validator('items')
-    def validate_items(cls, v):
-        """Validate items list."""
-        if len(v) > 100:
-            raise ValueError("Cannot process more than 100 items in a single bulk operation")
-        return v
-    
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "operation": "update_agents",
                 "items": [
@@ -307,3 +294,4 @@ class BulkOperationRequest(BaseModel):
                 }
             }
         }
+    )
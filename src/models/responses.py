@@ -2,30 +2,99 @@
 Response models for all API endpoints.
 """
 
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
-from pydantic import BaseModel, Field
+import sys
+from typing import Annotated, Any, Dict, List, Optional, Union
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, TypeAdapter
 
+from src.config.settings import get_settings
 from .common import BaseResponse, ResponseStatus, ServiceHealth, RateLimitInfo
 
+# Low-cardinality upstream strings (statuses, roles, model names) are interned
+# so repeated responses share one string object per value
+InternedStr = Annotated[str, AfterValidator(sys.intern)]
 
-class UserProfile(BaseModel):
+
+class TrustedConstructMixin:
+    """Adds from_trusted() to response models built from upstream payloads."""
+    
+    @classmethod
+    def from_trusted(cls, data: Dict[str, Any]):
+        """
+        Build a model from an AMS, Letta or LiteLLM payload.
+        
+        With SKIP_TRUSTED_VALIDATION enabled the payload is used as-is via
+        model_construct(), so only upstream service responses may come through
+        here - anything carrying user input must use model_validate().
+        """
+        if get_settings().skip_trusted_validation:
+            return cls.model_construct(**data)
+        return cls.model_validate(data)
+
+
+class AgentSummary(TrustedConstructMixin, BaseModel):
+    """Summary information for an agent."""
+    agent_id: str = Field(..., description="Unique agent identifier")
+    name: str = Field(..., description="Agent name")
+    description: Optional[str] = Field(None, description="Agent description")
+    status: InternedStr = Field(..., description="Agent status")
+    model: Optional[InternedStr] = Field(None, description="LLM model used by agent")
+    created_at: Optional[str] = Field(None, description="Agent creation timestamp")
+    updated_at: Optional[str] = Field(None, description="Last update timestamp")
+    message_count: Optional[int] = Field(None, description="Total message count")
+    
+    @classmethod
+    def list_from_trusted(cls, items: List[Dict[str, Any]]) -> List["AgentSummary"]:
+        """Build a list of agents from an AMS payload in a single validation pass."""
+        if get_settings().skip_trusted_validation:
+            return [cls.model_construct(**item) for item in items]
+        return AgentSummaryListAdapter.validate_python(items)
+    
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
+            "example": {
+                "agent_id": "agent_123456789",
+                "name": "Customer Support Agent",
+                "description": "AI agent for handling customer support queries",
+                "status": "active",
+                "model": "gpt-4",
+                "created_at": "2025-09-21T05:09:00Z",
+                "updated_at": "2025-09-21T05:09:00Z",
+                "message_count": 42
+            }
+        }
+    )
+
+
+class UserProfile(TrustedConstructMixin, BaseModel):
     """User profile information."""
     user_id: str = Field(..., description="Unique user identifier")
     email: Optional[str] = Field(None, description="User email address")
     display_name: Optional[str] = Field(None, description="User display name")
-    role: Optional[str] = Field(None, description="User role")
-    subscription_tier: Optional[str] = Field(None, description="User subscription tier")
+    role: Optional[InternedStr] = Field(None, description="User role")
+    subscription_tier: Optional[InternedStr] = Field(None, description="User subscription tier")
     litellm_key: Optional[str] = Field(None, description="User's LiteLLM API key for billing")
     letta_agent_id: Optional[str] = Field(None, description="User's Letta agent ID")
-    agent_status: Optional[str] = Field(None, description="User's agent status")
-    agents: List["AgentSummary"] = Field(default_factory=list, description="User's agents")
+    agent_status: Optional[InternedStr] = Field(None, description="User's agent status")
+    agents: List[AgentSummary] = Field(default_factory=list, description="User's agents")
     created_at: Optional[str] = Field(None, description="Account creation timestamp")
     last_active: Optional[str] = Field(None, description="Last activity timestamp")
     metadata: Optional[Dict[str, Any]] = Field(None, description="Additional user metadata")
     
-    class Config:
-        json_schema_extra = {
+    @classmethod
+    def from_trusted(cls, data: Dict[str, Any]) -> "UserProfile":
+        """Build a profile from trusted data, constructing nested agents too."""
+        if not get_settings().skip_trusted_validation:
+            return cls.model_validate(data)
+        agents = [
+            agent if isinstance(agent, AgentSummary) else AgentSummary.from_trusted(agent)
+            for agent in data.get("agents") or ()
+        ]
+        return cls.model_construct(**{**data, "agents": agents})
+    
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "user_id": "user_123456789",
                 "email": "user@example.com",
@@ -48,50 +117,26 @@ class UserProfile(BaseModel):
                 }
             }
         }
+    )
 
 
-class AgentSummary(BaseModel):
-    """Summary information for an agent."""
-    agent_id: str = Field(..., description="Unique agent identifier")
-    name: str = Field(..., description="Agent name")
-    description: Optional[str] = Field(None, description="Agent description")
-    status: str = Field(..., description="Agent status")
-    model: Optional[str] = Field(None, description="LLM model used by agent")
-    created_at: Optional[str] = Field(None, description="Agent creation timestamp")
-    updated_at: Optional[str] = Field(None, description="Last update timestamp")
-    message_count: Optional[int] = Field(None, description="Total message count")
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "agent_id": "agent_123456789",
-                "name": "Customer Support Agent",
-                "description": "AI agent for handling customer support queries",
-                "status": "active",
-                "model": "gpt-4",
-                "created_at": "2025-09-21T05:09:00Z",
-                "updated_at": "2025-09-21T05:09:00Z",
-                "message_count": 42
-            }
-        }
-
-
-class AgentInstance(BaseModel):
+class AgentInstance(TrustedConstructMixin, BaseModel):
     """Detailed agent information."""
     agent_id: str = Field(..., description="Unique agent identifier")
     user_id: str = Field(..., description="Owner user ID")
     name: str = Field(..., description="Agent name")
     description: Optional[str] = Field(None, description="Agent description")
-    status: str = Field(..., description="Agent status")
+    status: InternedStr = Field(..., description="Agent status")
     config: Dict[str, Any] = Field(default_factory=dict, description="Agent configuration")
     memory_summary: Optional[Dict[str, Any]] = Field(None, description="Memory summary")
     statistics: Optional[Dict[str, Any]] = Field(None, description="Agent statistics")
-    created_at: datetime = Field(..., description="Agent creation timestamp")
-    updated_at: Optional[datetime] = Field(None, description="Last update timestamp")
+    created_at: str = Field(..., description="Agent creation timestamp (ISO 8601)")
+    updated_at: Optional[str] = Field(None, description="Last update timestamp (ISO 8601)")
     metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "agent_id": "agent_123456789",
                 "user_id": "user_123456789",
@@ -122,18 +167,20 @@ class AgentInstance(BaseModel):
                 }
             }
         }
+    )
 
 
-class LettaMessage(BaseModel):
+class LettaMessage(TrustedConstructMixin, BaseModel):
     """Letta agent message."""
     message_id: str = Field(..., description="Unique message identifier")
-    role: str = Field(..., description="Message role")
+    role: InternedStr = Field(..., description="Message role")
     content: str = Field(..., description="Message content")
-    timestamp: datetime = Field(..., description="Message timestamp")
+    timestamp: str = Field(..., description="Message timestamp (ISO 8601)")
     metadata: Optional[Dict[str, Any]] = Field(None, description="Message metadata")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "message_id": "msg_123456789",
                 "role": "assistant",
@@ -146,19 +193,21 @@ class LettaMessage(BaseModel):
                 }
             }
         }
+    )
 
 
-class LettaAgent(BaseModel):
+class LettaAgent(TrustedConstructMixin, BaseModel):
     """Letta agent information."""
     id: str = Field(..., description="Agent ID")
     name: str = Field(..., description="Agent name")
-    created_at: datetime = Field(..., description="Creation timestamp")
-    last_updated: Optional[datetime] = Field(None, description="Last update timestamp")
+    created_at: str = Field(..., description="Creation timestamp (ISO 8601)")
+    last_updated: Optional[str] = Field(None, description="Last update timestamp (ISO 8601)")
     memory: Optional[Dict[str, Any]] = Field(None, description="Agent memory")
     config: Optional[Dict[str, Any]] = Field(None, description="Agent configuration")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "id": "letta_agent_123",
                 "name": "Support Agent",
@@ -174,9 +223,10 @@ class LettaAgent(BaseModel):
                 }
             }
         }
+    )
 
 
-class TemplateInfo(BaseModel):
+class TemplateInfo(TrustedConstructMixin, BaseModel):
     """Template information."""
     template_id: str = Field(..., description="Template ID")
     name: str = Field(..., description="Template name")
@@ -185,12 +235,13 @@ class TemplateInfo(BaseModel):
     author: Optional[str] = Field(None, description="Template author")
     is_public: bool = Field(False, description="Whether template is public")
     tags: List[str] = Field(default_factory=list, description="Template tags")
-    created_at: datetime = Field(..., description="Creation timestamp")
-    updated_at: Optional[datetime] = Field(None, description="Last update timestamp")
+    created_at: str = Field(..., description="Creation timestamp (ISO 8601)")
+    updated_at: Optional[str] = Field(None, description="Last update timestamp (ISO 8601)")
     usage_count: Optional[int] = Field(None, description="Number of times used")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "template_id": "template_123456789",
                 "name": "Customer Support Template",
@@ -204,6 +255,7 @@ class TemplateInfo(BaseModel):
                 "usage_count": 25
             }
         }
+    )
 
 
 class ValidationResult(BaseModel):
@@ -213,8 +265,8 @@ class ValidationResult(BaseModel):
     warnings: List[str] = Field(default_factory=list, description="Validation warnings")
     schema_version: Optional[str] = Field(None, description="Template schema version")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "is_valid": True,
                 "errors": [],
@@ -222,18 +274,20 @@ class ValidationResult(BaseModel):
                 "schema_version": "1.0"
             }
         }
+    )
 
 
-class LLMResponse(BaseModel):
+class LLMResponse(TrustedConstructMixin, BaseModel):
     """LLM proxy response."""
     id: str = Field(..., description="Response ID")
-    model: str = Field(..., description="Model used")
+    model: InternedStr = Field(..., description="Model used")
     choices: List[Dict[str, Any]] = Field(..., description="Response choices")
     usage: Optional[Dict[str, Any]] = Field(None, description="Token usage information")
     created: int = Field(..., description="Creation timestamp")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "id": "chatcmpl-123456789",
                 "model": "gpt-4",
@@ -255,6 +309,7 @@ class LLMResponse(BaseModel):
                 "created": 1695280140
             }
         }
+    )
 
 
 class HealthResponse(BaseResponse):
@@ -265,8 +320,8 @@ class HealthResponse(BaseResponse):
     version: str = Field(..., description="API version")
     uptime: Optional[float] = Field(None, description="Uptime in seconds")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "status": "success",
                 "message": "System is healthy",
@@ -287,6 +342,7 @@ class HealthResponse(BaseResponse):
                 "uptime": 86400.0
             }
         }
+    )
 
 
 class ApiInfo(BaseResponse):
@@ -298,8 +354,8 @@ class ApiInfo(BaseResponse):
     documentation_url: Optional[str] = Field(None, description="Documentation URL")
     endpoints: List[Dict[str, str]] = Field(default_factory=list, description="Available endpoints")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "status": "success",
                 "timestamp": "2025-09-21T05:09:00Z",
@@ -313,9 +369,10 @@ class ApiInfo(BaseResponse):
                 ]
             }
         }
+    )
 
 
-class BulkOperationResponse(BaseResponse):
+class BulkOperationResponse(TrustedConstructMixin, BaseResponse):
     """Bulk operation response."""
     status: ResponseStatus = ResponseStatus.SUCCESS
     total_items: int = Field(..., description="Total items processed")
@@ -324,8 +381,9 @@ class BulkOperationResponse(BaseResponse):
     results: List[Dict[str, Any]] = Field(default_factory=list, description="Individual results")
     errors: List[Dict[str, Any]] = Field(default_factory=list, description="Error details")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "status": "success",
                 "message": "Bulk operation completed",
@@ -342,8 +400,8 @@ class BulkOperationResponse(BaseResponse):
                 ]
             }
         }
+    )
 
 
-# Update forward references
-UserProfile.update_forward_refs()
-AgentSummary.update_forward_refs()
+# Validates a whole list of agents in one pydantic-core call
+AgentSummaryListAdapter = TypeAdapter(List[AgentSummary])
@@ -2,8 +2,11 @@
 Admin API endpoints for user management.
 """
 
-from typing import List, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, Query
+import hashlib
+import time
+from typing import Awaitable, Callable, List, Dict, Any, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+import orjson
 import structlog
 
 from src.dependencies.admin_auth import verify_admin_auth
@@ -11,7 +14,49 @@ from src.services.admin_service import get_admin_service
 
 logger = structlog.get_logger(__name__)
 
-router = APIRouter()
+# Every route here is admin-only; endpoints that also declare
+# Depends(verify_admin_auth) for the username share the same per-request
+# dependency cache entry, so the check still runs once per request
+router = APIRouter(dependencies=[Depends(verify_admin_auth)])
+
+# Admin dashboards poll the user list; serve repeated polls from memory for a
+# few seconds and let clients revalidate with If-None-Match
+USER_LIST_CACHE_TTL = 5.0
+
+# cache key -> (expires_at, serialized body, etag)
+_user_list_cache: Dict[str, Tuple[float, bytes, str]] = {}
+
+
+async def _cached_user_list(
+    key: str,
+    loader: Callable[[], Awaitable[List[Dict[str, Any]]]]
+) -> Tuple[bytes, str]:
+    """Return the serialized user list and its ETag, reloading when expired."""
+    now = time.monotonic()
+    entry = _user_list_cache.get(key)
+    if entry is not None and entry[0] > now:
+        return entry[1], entry[2]
+    
+    # Drop expired entries so one-off search queries don't accumulate
+    for stale_key in [k for k, v in _user_list_cache.items() if v[0] <= now]:
+        del _user_list_cache[stale_key]
+    
+    body = orjson.dumps(await loader())
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    _user_list_cache[key] = (now + USER_LIST_CACHE_TTL, body, etag)
+    return body, etag
+
+
+def _user_list_response(request: Request, body: bytes, etag: str) -> Response:
+    """Build a 304 when the client already has this list, else the JSON body."""
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+def invalidate_user_list_cache() -> None:
+    """Drop cached user lists after a mutation."""
+    _user_list_cache.clear()
 
 
 @router.get(
@@ -21,15 +66,16 @@ router = APIRouter()
     description="Get list of all users (admin only)"
 )
 async def get_all_users(
+    request: Request,
     admin_username: str = Depends(verify_admin_auth)
 ):
     """Get all users from the system."""
     logger.info("Admin fetching all users", admin=admin_username)
     
     admin_service = get_admin_service()
-    users = await admin_service.get_all_users()
+    body, etag = await _cached_user_list("users", admin_service.get_all_users)
     
-    return users
+    return _user_list_response(request, body, etag)
 
 
 @router.get(
@@ -39,6 +85,7 @@ async def get_all_users(
     description="Search users by email (admin only)"
 )
 async def search_users(
+    request: Request,
     q: str = Query(..., description="Search query (email)"),
     admin_username: str = Depends(verify_admin_auth)
 ):
@@ -46,9 +93,14 @@ async def search_users(
     logger.info("Admin searching users", admin=admin_username, query=q)
     
     admin_service = get_admin_service()
-    users = await admin_service.search_users(q)
+    # Email search is case-insensitive (ilike), so the lowered query is the key
+    query = q.lower()
+    body, etag = await _cached_user_list(
+        f"search:{query}",
+        lambda: admin_service.search_users(query)
+    )
     
-    return users
+    return _user_list_response(request, body, etag)
 
 
 @router.delete(
@@ -59,6 +111,7 @@ async def search_users(
 )
 async def delete_user(
     user_id: str,
+    request: Request,
     admin_username: str = Depends(verify_admin_auth)
 ):
     """Delete a user with cascade deletion of all associated data."""
@@ -71,24 +124,9 @@ async def delete_user(
     admin_service = get_admin_service()
     
     try:
-        result = await admin_service.delete_user_cascade(user_id)
-        
-        logger.info(
-            "User deleted successfully by admin",
-            admin=admin_username,
-            user_id=user_id,
-            result=result
+        result = await admin_service.delete_user_cascade(
+            user_id, request.app.state.letta_client
         )
-        
-        return {
-            "status": "success",
-            "message": f"User {user_id} deleted successfully",
-            "result": result
-        }
-        
-    except ValueError as e:
-        logger.warning("User not found for deletion", user_id=user_id, error=str(e))
-        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         logger.error(
             "Failed to delete user",
@@ -97,6 +135,24 @@ async def delete_user(
             error=str(e)
         )
         raise HTTPException(status_code=500, detail=f"Failed to delete user: {str(e)}")
+    
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"User {user_id} not found in user_profiles")
+    
+    invalidate_user_list_cache()
+    
+    logger.info(
+        "User deleted successfully by admin",
+        admin=admin_username,
+        user_id=user_id,
+        result=result
+    )
+    
+    return {
+        "status": "success",
+        "message": f"User {user_id} deleted successfully",
+        "result": result
+    }
 
 
 @router.post(
@@ -106,6 +162,7 @@ async def delete_user(
     description="Delete all users from the system (admin only, DANGEROUS)"
 )
 async def delete_all_users(
+    request: Request,
     admin_username: str = Depends(verify_admin_auth)
 ):
     """
@@ -120,7 +177,8 @@ async def delete_all_users(
     admin_service = get_admin_service()
     
     try:
-        result = await admin_service.delete_all_users()
+        result = await admin_service.delete_all_users(request.app.state.letta_client)
+        invalidate_user_list_cache()
         
         if result["status"] == "success":
             logger.warning(
@@ -2,19 +2,30 @@
 Admin UI router - serves HTML pages for admin panel.
 """
 
+from pathlib import Path
+
 from fastapi import APIRouter, Request, Depends
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 import structlog
 
+from src.config.settings import get_settings
 from src.dependencies.admin_auth import verify_admin_auth
 
 logger = structlog.get_logger(__name__)
 
-router = APIRouter()
-
-# Setup Jinja2 templates
-templates = Jinja2Templates(directory="src/templates")
+# Every route here is admin-only; endpoints that also declare
+# Depends(verify_admin_auth) for the username share the same per-request
+# dependency cache entry, so the check still runs once per request
+router = APIRouter(dependencies=[Depends(verify_admin_auth)])
+
+# Setup Jinja2 templates relative to this package rather than the working
+# directory. Outside development the templates never change on disk, so
+# Jinja's template cache skips the per-render mtime check
+templates = Jinja2Templates(
+    directory=str(Path(__file__).resolve().parent.parent / "templates"),
+    auto_reload=get_settings().is_development
+)
 
 
 @router.get(
@@ -33,11 +44,11 @@ async def admin_dashboard(
     """
     logger.info("Admin accessing dashboard", admin=admin_username)
     
-    return templates.TemplateResponse(
-        "admin_dashboard.html",
-        {
-            "request": request,
-            "admin_username": admin_username
-        }
+    # Render straight into an HTMLResponse instead of going through
+    # TemplateResponse's context handling; the template is compiled on first
+    # use and then served from Jinja's cache
+    dashboard_template = templates.get_template("admin_dashboard.html")
+    return HTMLResponse(
+        dashboard_template.render(request=request, admin_username=admin_username)
     )
 
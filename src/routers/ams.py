@@ -3,12 +3,14 @@ AMS (Agent Management Service) proxy router.
 Provides a unified interface for all AMS operations.
 """
 
-import json
 from typing import Optional, Dict, Any
-from fastapi import APIRouter, Request, Depends, Header, HTTPException, Response
+from fastapi import APIRouter, Request, Depends, Header, HTTPException
 from fastapi.responses import StreamingResponse
+import orjson
 import structlog
+from starlette.background import BackgroundTask
 
+from src.config.settings import get_settings
 from src.dependencies.auth import get_current_user_id
 from src.services.ams_client import get_ams_client
 
@@ -16,6 +18,42 @@ logger = structlog.get_logger(__name__)
 
 router = APIRouter()
 
+# Upstream response headers never passed back to the client: credentials,
+# framing headers (the body is re-chunked by uvicorn) and content-type (set
+# from media_type instead)
+_STRIPPED_RESPONSE_HEADERS = frozenset({
+    b"authorization",
+    b"x-user-id",
+    b"content-length",
+    b"transfer-encoding",
+    b"content-type",
+})
+
+# Methods whose request body is forwarded to AMS
+_BODY_METHODS = frozenset({"POST", "PUT", "PATCH"})
+
+
+async def _read_bounded_body(request: Request, limit: int) -> bytes:
+    """
+    Read the request body, rejecting it with 413 once it exceeds limit bytes.
+    
+    A declared Content-Length over the limit is refused before reading;
+    otherwise chunks are counted as they arrive so an oversized or
+    mis-declared body never gets fully buffered.
+    """
+    declared_length = request.headers.get("content-length")
+    if declared_length and declared_length.isdigit() and int(declared_length) > limit:
+        raise HTTPException(status_code=413, detail=f"Request body exceeds {limit} bytes")
+    
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise HTTPException(status_code=413, detail=f"Request body exceeds {limit} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
 
 @router.api_route(
     "/{path:path}",
@@ -52,29 +90,26 @@ async def ams_proxy(
         # Get AMS client
         ams_client = await get_ams_client()
         
-        # Read request body if present
-        body = None
-        content_type = request.headers.get("content-type", "")
-        
-        if request.method in ["POST", "PUT", "PATCH"]:
-            try:
-                body = await request.body()
-            except Exception as e:
-                logger.warning("Failed to read request body", error=str(e))
-        
         # Prepare headers for AMS request
         headers = {}
         if idempotency_key:
             headers["Idempotency-Key"] = idempotency_key
         
-        # Parse JSON data if present
-        json_data = None
-        if body and content_type.startswith('application/json'):
+        # Read request body if present; GETs and explicitly empty bodies skip
+        # this entirely. The body is forwarded byte-for-byte; AMS validates
+        # it, so there is no need to parse and re-encode it here
+        body = None
+        if request.method in _BODY_METHODS and request.headers.get("content-length") != "0":
             try:
-                json_data = json.loads(body.decode('utf-8'))
-            except json.JSONDecodeError:
-                logger.warning("Failed to parse JSON body", body=body.decode('utf-8', errors='ignore'))
-                raise HTTPException(status_code=400, detail="Invalid JSON in request body")
+                body = await _read_bounded_body(request, get_settings().max_request_size)
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.warning("Failed to read request body", error=str(e))
+            
+            content_type = request.headers.get("content-type")
+            if body and content_type:
+                headers["Content-Type"] = content_type
         
         # Forward the request to AMS
         # Note: AMS Edge function expects paths without /ams prefix
@@ -83,34 +118,40 @@ async def ams_proxy(
             path=f"/{path}",  # Direct path to AMS Edge function
             user_id=user_id,
             headers=headers,
-            json_data=json_data
+            raw_body=body or None,
+            stream=True
         )
         
-        # Get response data
-        response_data = response.content
         status_code = response.status_code
-        response_headers = dict(response.headers)
         
-        # Remove any sensitive headers
-        response_headers.pop("authorization", None)
-        response_headers.pop("x-user-id", None)
-        # Remove Content-Length to let FastAPI/uvicorn calculate it automatically
-        response_headers.pop("content-length", None)
+        # Filter the raw header pairs in one pass; this also keeps repeated
+        # headers such as Set-Cookie intact
+        response_headers = [
+            (name.lower(), value)
+            for name, value in response.headers.raw
+            if name.lower() not in _STRIPPED_RESPONSE_HEADERS
+        ]
         
         logger.info(
             "AMS proxy response",
             status_code=status_code,
-            content_length=len(response_data) if response_data else 0
+            content_length=response.headers.get("content-length")
         )
         
-        # Return response
-        return Response(
-            content=response_data,
+        # Stream the upstream body through as it arrives; raw bytes keep any
+        # content-encoding intact, and the upstream response is closed once the
+        # client is done (or disconnects)
+        proxied_response = StreamingResponse(
+            response.aiter_raw(),
             status_code=status_code,
-            headers=response_headers,
-            media_type=response_headers.get("content-type", "application/json")
+            media_type=response.headers.get("content-type", "application/json"),
+            background=BackgroundTask(response.aclose)
         )
+        proxied_response.raw_headers.extend(response_headers)
+        return proxied_response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(
             "AMS proxy error",
@@ -148,7 +189,7 @@ async def ams_health():
             method="GET",
             path="/health"
         )
-        return response.json()
+        return orjson.loads(response.content)
     except Exception as e:
         logger.error("AMS health check failed", error=str(e))
         raise HTTPException(
@@ -170,97 +211,6 @@ async def get_user_profile(
     return await ams_client.get_user_profile(user_id)
 
 
-@router.post(
-    "/agents/create",
-    summary="Create Agent",
-    description="Create a new agent via AMS"
-)
-async def create_agent(
-    request: Request,
-    user_id: str = Depends(get_current_user_id),
-    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
-):
-    """Create a new agent via AMS."""
-    ams_client = await get_ams_client()
-    
-    # Read and validate request body
-    body = await request.body()
-    if not body:
-        raise HTTPException(status_code=400, detail="Request body is required")
-    
-    try:
-        import json
-        request_data = json.loads(body.decode('utf-8'))
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Invalid JSON in request body")
-    
-    # Validate required fields
-    if not request_data.get('template_id'):
-        raise HTTPException(status_code=400, detail="template_id is required")
-    
-    # Prepare headers
-    headers = {}
-    if idempotency_key:
-        headers["Idempotency-Key"] = idempotency_key
-    
-    # Forward to AMS
-    response = await ams_client._make_request(
-        method="POST",
-        path="/agents/create",
-        user_id=user_id,
-        headers=headers,
-        json_data=request_data
-    )
-    
-    return response.json()
-
-
-@router.post(
-    "/agents/{agent_id}/upgrade",
-    summary="Upgrade Agent",
-    description="Upgrade an agent to a new version"
-)
-async def upgrade_agent(
-    agent_id: str,
-    request: Request,
-    user_id: str = Depends(get_current_user_id),
-    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
-):
-    """Upgrade an agent via AMS."""
-    ams_client = await get_ams_client()
-    
-    # Read request body
-    body = await request.body()
-    if not body:
-        raise HTTPException(status_code=400, detail="Request body is required")
-    
-    try:
-        import json
-        request_data = json.loads(body.decode('utf-8'))
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Invalid JSON in request body")
-    
-    # Validate required fields
-    if not request_data.get('target_version'):
-        raise HTTPException(status_code=400, detail="target_version is required")
-    
-    # Prepare headers
-    headers = {}
-    if idempotency_key:
-        headers["Idempotency-Key"] = idempotency_key
-    
-    # Forward to AMS
-    response = await ams_client._make_request(
-        method="POST",
-        path=f"/agents/{agent_id}/upgrade",
-        user_id=user_id,
-        headers=headers,
-        json_data=request_data
-    )
-    
-    return response.json()
-
-
 @router.post(
     "/templates/validate",
     summary="Validate Template",
@@ -278,14 +228,15 @@ async def validate_template(
     if not body:
         raise HTTPException(status_code=400, detail="Request body is required")
     
-    # Forward to AMS (templates/validate doesn't need user_id)
+    # Forward the JSON body as-is (templates/validate doesn't need user_id)
     response = await ams_client._make_request(
         method="POST",
         path="/templates/validate",
-        json_data=body.decode('utf-8')
+        headers={"Content-Type": request.headers.get("content-type", "application/json")},
+        raw_body=body
     )
     
-    return response.json()
+    return orjson.loads(response.content)
 
 
 @router.post(
@@ -307,17 +258,17 @@ async def publish_template(
         raise HTTPException(status_code=400, detail="Request body is required")
     
     # Prepare headers
-    headers = {}
+    headers = {"Content-Type": request.headers.get("content-type", "application/json")}
     if idempotency_key:
         headers["Idempotency-Key"] = idempotency_key
     
-    # Forward to AMS
+    # Forward the JSON body to AMS as-is
     response = await ams_client._make_request(
         method="POST",
         path="/templates/publish",
         user_id=user_id,
         headers=headers,
-        json_data=body.decode('utf-8')
+        raw_body=body
     )
     
-    return response.json()
+    return orjson.loads(response.content)
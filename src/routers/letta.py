@@ -2,12 +2,14 @@
 Simple Letta proxy router - direct pass-through with blacklist filtering, streaming, and file upload support.
 """
 
-import re
+import importlib.util
+import logging
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from fastapi import APIRouter, Request, Depends, HTTPException, UploadFile, File, Form
 from fastapi.responses import Response, StreamingResponse
 import httpx
+import orjson
 import structlog
 
 from src.dependencies.auth import get_current_user_id
@@ -27,56 +29,121 @@ BLACKLISTED_PATTERNS = [
 
 # Streaming endpoints patterns
 STREAMING_PATTERNS = [
-    r"^/v1/agents/[^/]+/messages/stream$",    # Message streaming
-    r"^/v1/agents/[^/]+/runs/[^/]+/stream$",  # Run streaming
-    r"^/v1/agents/[^/]+/messages/stream.*$",  # Message streaming with params
-    r"^/v1/agents/[^/]+/runs/[^/]+/stream.*$",  # Run streaming with params
+    r"^/v1/agents/[^/]+/messages/stream",     # Message streaming (with or without params)
+    r"^/v1/agents/[^/]+/runs/[^/]+/stream",   # Run streaming (with or without params)
 ]
 
-# HTTP client for Letta
-_letta_client: httpx.AsyncClient = None
+# The pattern lists above document the rules (and are reported by the debug
+# endpoints); classify_path implements them with plain string operations
+_AGENTS_PREFIX = "/v1/agents/"
 
-async def get_letta_client() -> httpx.AsyncClient:
-    """Get or create Letta HTTP client."""
-    global _letta_client
-    
-    if _letta_client is None:
-        _letta_client = httpx.AsyncClient(
-            base_url=str(settings.letta_base_url).rstrip('/'),
-            timeout=httpx.Timeout(settings.letta_timeout),
-            headers={
-                "Authorization": f"Bearer {settings.letta_api_key}",
-                # Content-Type will be set per-request to support both JSON and multipart/form-data
-            },
-            # Disable response buffering for streaming
-            follow_redirects=True
-        )
-    
-    return _letta_client
+# Client headers never forwarded to Letta (ASGI header names are lowercase
+# bytes). Credentials and host belong to this hop, and httpx re-frames the
+# body itself. For multipart bodies httpx also sets its own boundary.
+_EXCLUDED_REQUEST_HEADERS = frozenset({b"authorization", b"host", b"content-length", b"transfer-encoding"})
+_EXCLUDED_MULTIPART_REQUEST_HEADERS = _EXCLUDED_REQUEST_HEADERS | {b"content-type"}
 
-def is_blacklisted(path: str) -> bool:
-    """Check if path is blacklisted."""
-    for pattern in BLACKLISTED_PATTERNS:
-        if re.match(pattern, path):
-            return True
-    return False
+# Upstream framing headers; the response body is re-framed on the way out.
+# httpx has already decoded the body, so its content-encoding no longer applies
+_EXCLUDED_RESPONSE_HEADERS = frozenset({b"content-length", b"transfer-encoding", b"content-encoding"})
 
-def is_streaming_endpoint(path: str) -> bool:
-    """Check if path is a streaming endpoint."""
-    for pattern in STREAMING_PATTERNS:
-        if re.match(pattern, path):
-            logger.debug(
-                "Streaming pattern matched",
-                path=path,
-                pattern=pattern
-            )
-            return True
-    logger.debug(
-        "No streaming pattern matched",
-        path=path,
-        patterns=STREAMING_PATTERNS
+# Upstream failures during streaming: (exception type, log event, SSE error
+# event sent to the client)
+_SSE_UPSTREAM_ERRORS = (
+    (
+        httpx.ConnectError,
+        "Letta connection error",
+        b"data: " + orjson.dumps({"error": "Connection to Letta API failed. Please try again."}) + b"\n\n",
+    ),
+    (
+        httpx.TimeoutException,
+        "Letta timeout error",
+        b"data: " + orjson.dumps({"error": "Letta API request timed out. Please try again."}) + b"\n\n",
+    ),
+)
+
+# Upstream failures for regular requests: (exception type, log event, status
+# code, detail). Checked in order, so the TimeoutException and ConnectError
+# subclasses must come before RequestError
+_UPSTREAM_ERRORS = (
+    (httpx.TimeoutException, "Letta request timeout", 504, "Letta service timeout"),
+    (httpx.ConnectError, "Letta connection error", 502, "Letta service unavailable - connection failed"),
+    (httpx.RequestError, "Letta request error", 502, "Letta service unavailable"),
+)
+
+# Response headers for proxied SSE streams; shared across requests and only
+# copied when a stream needs extra headers
+_SSE_RESPONSE_HEADERS = {
+    "Content-Type": "text/event-stream",
+    "Cache-Control": "no-cache, no-store, must-revalidate",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # Disable nginx buffering
+    "X-Content-Type-Options": "nosniff",
+    "Transfer-Encoding": "chunked",
+    # Keep GZipMiddleware from buffering the event stream
+    "Content-Encoding": "identity",
+    # CORS headers for streaming
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
+    "Access-Control-Allow-Headers": "Authorization, Content-Type, Accept, Origin, X-Requested-With",
+    "Access-Control-Allow-Credentials": "true",
+}
+
+# HTTP client for Letta; HTTP/2 needs the h2 package, so fall back to
+# HTTP/1.1 without it
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+def create_letta_client() -> httpx.AsyncClient:
+    """
+    Create the Letta HTTP client.
+    
+    Called once from the app lifespan, which keeps the client on
+    app.state.letta_client and closes it on shutdown.
+    """
+    return httpx.AsyncClient(
+        base_url=str(settings.letta_base_url).rstrip('/'),
+        timeout=httpx.Timeout(settings.letta_timeout),
+        headers={
+            "Authorization": f"Bearer {settings.letta_api_key}",
+            # Content-Type will be set per-request to support both JSON and multipart/form-data
+        },
+        limits=httpx.Limits(
+            max_keepalive_connections=100,  # Keep enough idle sockets for proxy bursts
+            max_connections=200,
+            keepalive_expiry=60.0
+        ),
+        http2=_HTTP2_AVAILABLE,
+        # Disable response buffering for streaming
+        follow_redirects=True
     )
-    return False
+
+def classify_path(path: str) -> Tuple[bool, bool]:
+    """
+    Classify a rewritten Letta path against the blacklist and streaming rules.
+    
+    Both checks share the '/v1/agents/{agent_id}' split, so they are done
+    together in a single pass.
+    
+    Returns:
+        Tuple of (is_blacklisted, is_streaming)
+    """
+    if path.startswith(_AGENTS_PREFIX):
+        agent_id, sep, tail = path[len(_AGENTS_PREFIX):].partition("/")
+        if not agent_id:
+            return False, False
+        if not sep:
+            # /v1/agents/{agent_id}
+            return True, False
+        # /v1/agents/{agent_id}/messages/stream...
+        if tail.startswith("messages/stream"):
+            return False, True
+        # /v1/agents/{agent_id}/runs/{run_id}/stream...
+        if tail.startswith("runs/"):
+            run_id, sep, run_tail = tail[5:].partition("/")
+            return False, bool(run_id) and bool(sep) and run_tail.startswith("stream")
+        return False, False
+    
+    return path == "/v1/agents" or path.startswith(("/admin/", "/users/")), False
 
 def is_multipart_request(content_type: Optional[str]) -> bool:
     """Check if request is multipart/form-data."""
@@ -102,7 +169,7 @@ async def debug_streaming_patterns():
         "stream_tokens_support": {
             "description": "stream_tokens parameter enables token-level streaming",
             "supported_in": "request body (json_data.stream_tokens) or query params",
-            "chunk_size": "64 bytes for token streaming, 1024 bytes for regular streaming"
+            "chunk_size": "upstream chunks are forwarded as received"
         },
         "test_paths": [
             "/v1/agents/test-agent/messages/stream",
@@ -111,8 +178,8 @@ async def debug_streaming_patterns():
         ],
         "test_results": {
             path: {
-                "is_streaming": is_streaming_endpoint(path),
-                "is_blacklisted": is_blacklisted(path),
+                "is_streaming": classify_path(path)[1],
+                "is_blacklisted": classify_path(path)[0],
                 "has_stream_tokens_param": "stream_tokens=true" in path
             }
             for path in [
@@ -151,19 +218,13 @@ async def letta_proxy(
     - application/json: Standard JSON requests
     - multipart/form-data: File uploads with optional form fields
     """
-    logger.info(
-        "Letta proxy called",
-        method=request.method,
-        path=path,
-        full_url=str(request.url),
-        user_id=user_id
-    )
-    
     # Rewrite path: /api/v1/letta/agents -> /v1/agents
     letta_path = f"/v1/{path}" if path else "/v1/"
     
+    is_blacklisted, is_streaming = classify_path(letta_path)
+    
     # Check blacklist
-    if is_blacklisted(letta_path):
+    if is_blacklisted:
         logger.warning(
             "Blocked blacklisted Letta operation",
             method=request.method,
@@ -175,26 +236,26 @@ async def letta_proxy(
             detail=f"Operation not allowed: {request.method} {letta_path}"
         )
     
-    # Check if this is a streaming endpoint
-    is_streaming = is_streaming_endpoint(letta_path)
-    
-    # Debug logging for streaming detection
-    logger.info(
-        "Streaming endpoint detection",
-        letta_path=letta_path,
-        is_streaming=is_streaming,
-        patterns=STREAMING_PATTERNS,
-        user_id=user_id
-    )
-    
     # Detect request content type
     content_type = request.headers.get("content-type", "")
     is_multipart = is_multipart_request(content_type)
     
+    # The query string is forwarded verbatim (repeated keys included) as part
+    # of the upstream URL rather than rebuilt from parsed params
+    query_string = request.scope["query_string"]
+    letta_url = f"{letta_path}?{query_string.decode('latin-1')}" if query_string else letta_path
+    
+    # stream_tokens may also be requested via the query string (backward compatibility)
+    query_stream_tokens = (
+        b"stream_tokens" in query_string
+        and request.query_params.get("stream_tokens", "").lower() == "true"
+    )
+    
     # Prepare request data based on content type
     json_data = None
     files_data = None
     form_data = None
+    raw_body = None
     
     if is_multipart:
         # Handle multipart/form-data (file upload)
@@ -254,28 +315,33 @@ async def letta_proxy(
                 detail=f"Invalid multipart/form-data: {str(e)}"
             )
     
-    elif content_type.startswith("application/json"):
-        # Handle JSON data
+    elif content_type.startswith("application/json") and (is_streaming or query_stream_tokens):
+        # JSON is only decoded when stream_tokens has to be read from or
+        # injected into the body
         try:
-            json_data = await request.json()
-        except Exception:
+            json_data = orjson.loads(await request.body())
+        except orjson.JSONDecodeError:
             json_data = None
     
-    # Check if stream_tokens is enabled (for token-level streaming)
-    stream_tokens = False
-    if json_data and isinstance(json_data, dict):
-        stream_tokens = json_data.get("stream_tokens", False)
+    elif request.headers.get("content-length", "0") != "0" or "transfer-encoding" in request.headers:
+        # Any other body goes upstream untouched. It is buffered rather than
+        # piped so httpx can replay it if the client follows a 307/308 redirect
+        raw_body = await request.body()
     
-    # Also check query params for stream_tokens (backward compatibility)
-    if not stream_tokens:
-        stream_tokens = request.query_params.get("stream_tokens", "").lower() == "true"
+    # Check if stream_tokens is enabled (for token-level streaming), either in
+    # the body or in the query params (backward compatibility)
+    is_json_object = isinstance(json_data, dict)
+    body_stream_tokens = json_data.get("stream_tokens") if is_json_object else None
+    stream_tokens = bool(body_stream_tokens) or query_stream_tokens
     
-    # Ensure stream_tokens is passed to Letta API in request body
-    if stream_tokens and json_data and isinstance(json_data, dict):
-        json_data["stream_tokens"] = True
-    elif stream_tokens and not json_data:
-        # If no JSON data but stream_tokens is in query params, create JSON data
-        json_data = {"stream_tokens": True}
+    # Ensure stream_tokens is passed to Letta API in request body; a body that
+    # already carries stream_tokens=true is forwarded as-is
+    if stream_tokens and body_stream_tokens is not True:
+        if is_json_object:
+            json_data["stream_tokens"] = True
+        elif not json_data and raw_body is None:
+            # If no JSON data but stream_tokens is in query params, create JSON data
+            json_data = {"stream_tokens": True}
     
     logger.info(
         "Letta proxy request",
@@ -283,69 +349,52 @@ async def letta_proxy(
         path=letta_path,
         user_id=user_id,
         is_streaming=is_streaming,
-        stream_tokens=stream_tokens,
-        json_data_keys=list(json_data.keys()) if json_data and isinstance(json_data, dict) else None,
-        query_params=dict(request.query_params)
+        stream_tokens=stream_tokens
     )
     
     try:
-        # Get Letta client
-        letta_client = await get_letta_client()
-        
-        # Prepare headers (exclude certain headers)
-        headers = {}
-        excluded_headers = ["authorization", "host", "content-length"]
+        # Shared Letta client, created during app startup
+        letta_client = request.app.state.letta_client
         
-        # For multipart requests, also exclude content-type (let httpx handle it)
-        if is_multipart:
-            excluded_headers.append("content-type")
-        
-        for key, value in request.headers.items():
-            if key.lower() not in excluded_headers:
-                headers[key] = value
+        # Prepare headers (exclude certain headers). Names stay lowercase so
+        # the overrides below replace, rather than duplicate, a forwarded header
+        excluded_headers = _EXCLUDED_MULTIPART_REQUEST_HEADERS if is_multipart else _EXCLUDED_REQUEST_HEADERS
+        headers = {
+            key.decode("latin-1"): value.decode("latin-1")
+            for key, value in request.headers.raw
+            if key not in excluded_headers
+        }
         
         # Add user context
-        headers["X-User-Id"] = user_id
+        headers["x-user-id"] = user_id
         
         # For JSON requests, ensure proper content type
         if not is_multipart and json_data is not None:
-            headers["Content-Type"] = "application/json"
-            headers["Accept"] = "application/json"
+            headers["content-type"] = "application/json"
+            headers["accept"] = "application/json"
         
         # For streaming requests, ensure proper headers
         if is_streaming:
-            headers["Accept"] = "text/event-stream"
-            headers["Cache-Control"] = "no-cache"
+            headers["accept"] = "text/event-stream"
+            headers["cache-control"] = "no-cache"
+            # Raw chunks are forwarded, so the stream must not be compressed
+            headers["accept-encoding"] = "identity"
             
             # For token-level streaming, add specific headers
             if stream_tokens:
-                headers["Accept"] = "text/event-stream"
-                headers["X-Stream-Tokens"] = "true"
+                headers["accept"] = "text/event-stream"
+                headers["x-stream-tokens"] = "true"
         
         # Handle streaming vs regular requests
         if is_streaming:
-            logger.info(
-                "Entering streaming mode",
-                path=letta_path,
-                user_id=user_id,
-                stream_tokens=stream_tokens
-            )
             # Streaming mode
             async def stream_response():
-                logger.info(
-                    "Starting Letta streaming request",
-                    method=request.method,
-                    url=letta_path,
-                    user_id=user_id
-                )
-                
                 try:
                     # Prepare request parameters
                     request_params = {
                         "method": request.method,
-                        "url": letta_path,
-                        "headers": headers,
-                        "params": dict(request.query_params)
+                        "url": letta_url,
+                        "headers": headers
                     }
                     
                     # Add data based on content type
@@ -356,16 +405,11 @@ async def letta_proxy(
                             request_params["data"] = form_data
                     elif json_data is not None:
                         # For JSON requests
-                        request_params["json"] = json_data
+                        request_params["content"] = orjson.dumps(json_data)
+                    elif raw_body is not None:
+                        request_params["content"] = raw_body
                     
                     async with letta_client.stream(**request_params) as response:
-                        # Check response status
-                        logger.info(
-                            "Letta streaming response received",
-                            status_code=response.status_code,
-                            user_id=user_id
-                        )
-                        
                         if response.status_code >= 400:
                             logger.error(
                                 "Letta streaming error",
@@ -376,51 +420,39 @@ async def letta_proxy(
                             yield f"data: {response.text}\n\n".encode()
                             return
                         
-                        # Stream response chunks immediately
-                        chunk_count = 0
-                        total_bytes = 0
                         start_time = time.time()
+                        # Forward upstream reads as they arrive, without decoding or
+                        # rechunking; Letta already frames SSE events (and token
+                        # boundaries) itself
+                        chunks = response.aiter_raw()
                         
-                        logger.info(
-                            "Starting stream forwarding",
-                            path=letta_path,
-                            user_id=user_id,
-                            stream_tokens=stream_tokens,
-                            content_type=response.headers.get("content-type"),
-                            transfer_encoding=response.headers.get("transfer-encoding"),
-                            response_headers=dict(response.headers),
-                            status_code=response.status_code
-                        )
+                        if not logging.getLogger().isEnabledFor(logging.DEBUG):
+                            # Fast path: no per-chunk bookkeeping
+                            async for chunk in chunks:
+                                yield chunk
+                            
+                            logger.info(
+                                "Streaming completed",
+                                duration_seconds=round(time.time() - start_time, 2),
+                                path=letta_path,
+                                user_id=user_id,
+                                streaming_mode="token-level" if stream_tokens else "regular"
+                            )
+                            return
                         
-                        if stream_tokens:
-                            # For token streaming, pass data as-is without chunking
-                            # Let Letta API handle the token boundaries
-                            logger.debug("Starting token streaming iteration")
-                            async for chunk in response.aiter_bytes():
-                                if chunk:
-                                    chunk_count += 1
-                                    total_bytes += len(chunk)
-                                    
-                                    logger.debug(
-                                        "Token streaming chunk",
-                                        chunk_size=len(chunk),
-                                        chunk_count=chunk_count
-                                    )
-                                    yield chunk
-                        else:
-                            # For regular streaming, use smaller chunk size for better responsiveness
-                            logger.debug("Starting regular streaming iteration")
-                            async for chunk in response.aiter_bytes(chunk_size=512):
-                                if chunk:
-                                    chunk_count += 1
-                                    total_bytes += len(chunk)
-                                    
-                                    logger.debug(
-                                        "Regular streaming chunk",
-                                        chunk_size=len(chunk),
-                                        chunk_count=chunk_count
-                                    )
-                                    yield chunk
+                        # Debug path: count and log every chunk
+                        chunk_count = 0
+                        total_bytes = 0
+                        async for chunk in chunks:
+                            chunk_count += 1
+                            total_bytes += len(chunk)
+                            
+                            logger.debug(
+                                "Streaming chunk",
+                                chunk_size=len(chunk),
+                                chunk_count=chunk_count
+                            )
+                            yield chunk
                         
                         duration = time.time() - start_time
                         
@@ -448,54 +480,28 @@ async def letta_proxy(
                                 streaming_mode="token-level" if stream_tokens else "regular"
                             )
                                 
-                except httpx.ConnectError as e:
-                    logger.error(
-                        "Letta connection error",
-                        path=letta_path,
-                        user_id=user_id,
-                        error=str(e),
-                        error_type="ConnectError"
-                    )
-                    yield f"data: {{'error': 'Connection to Letta API failed. Please try again.'}}\n\n".encode()
-                except httpx.TimeoutException as e:
-                    logger.error(
-                        "Letta timeout error",
-                        path=letta_path,
-                        user_id=user_id,
-                        error=str(e),
-                        error_type="TimeoutException"
-                    )
-                    yield f"data: {{'error': 'Letta API request timed out. Please try again.'}}\n\n".encode()
                 except Exception as e:
+                    for error_type, event, error_message in _SSE_UPSTREAM_ERRORS:
+                        if isinstance(e, error_type):
+                            break
+                    else:
+                        event = "Streaming error"
+                        error_message = b"data: " + orjson.dumps({"error": f"Streaming failed: {e}"}) + b"\n\n"
+                    
                     logger.error(
-                        "Streaming error",
+                        event,
                         path=letta_path,
                         user_id=user_id,
                         error=str(e),
                         error_type=type(e).__name__
                     )
-                    yield f"data: {{'error': 'Streaming failed: {str(e)}'}}\n\n".encode()
-            
-            # Prepare response headers
-            response_headers = {
-                "Content-Type": "text/event-stream",
-                "Cache-Control": "no-cache, no-store, must-revalidate",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no",  # Disable nginx buffering
-                "X-Content-Type-Options": "nosniff",
-                "Transfer-Encoding": "chunked",
-                # Add CORS headers for streaming
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
-                "Access-Control-Allow-Headers": "Authorization, Content-Type, Accept, Origin, X-Requested-With",
-                "Access-Control-Allow-Credentials": "true",
-            }
+                    yield error_message
             
             # Add token streaming specific headers
             if stream_tokens:
-                response_headers["X-Stream-Tokens"] = "true"
-            
-            logger.debug("Letta streaming response created", headers=response_headers)
+                response_headers = {**_SSE_RESPONSE_HEADERS, "X-Stream-Tokens": "true"}
+            else:
+                response_headers = _SSE_RESPONSE_HEADERS
             
             return StreamingResponse(
                 stream_response(),
@@ -504,21 +510,11 @@ async def letta_proxy(
             )
         else:
             # Regular mode
-            logger.info(
-                "Entering regular mode (non-streaming)",
-                path=letta_path,
-                user_id=user_id,
-                is_streaming=is_streaming,
-                is_multipart=is_multipart,
-                has_files=bool(files_data) if files_data else False
-            )
-            
             # Prepare request parameters
             request_params = {
                 "method": request.method,
-                "url": letta_path,
-                "headers": headers,
-                "params": dict(request.query_params)
+                "url": letta_url,
+                "headers": headers
             }
             
             # Add data based on content type
@@ -535,70 +531,51 @@ async def letta_proxy(
                 )
             elif json_data is not None:
                 # For JSON requests
-                request_params["json"] = json_data
+                request_params["content"] = orjson.dumps(json_data)
+            elif raw_body is not None:
+                request_params["content"] = raw_body
             
             response = await letta_client.request(**request_params)
             
-            # Return response directly
-            return Response(
+            # Return response directly; the raw header pairs are forwarded in
+            # one filtering pass, which also keeps repeated Set-Cookie headers
+            # and the upstream Content-Type as sent
+            proxied_response = Response(
                 content=response.content,
-                status_code=response.status_code,
-                headers={
-                    k: v for k, v in response.headers.items()
-                    if k.lower() not in ["content-length", "transfer-encoding"]
-                },
-                media_type=response.headers.get("content-type")
+                status_code=response.status_code
+            )
+            proxied_response.raw_headers.extend(
+                (name.lower(), value)
+                for name, value in response.headers.raw
+                if name.lower() not in _EXCLUDED_RESPONSE_HEADERS
             )
+            return proxied_response
         
-    except httpx.TimeoutException as e:
-        logger.error(
-            "Letta request timeout", 
-            path=letta_path, 
-            user_id=user_id, 
-            error=str(e),
-            error_type="TimeoutException"
-        )
-        raise HTTPException(status_code=504, detail="Letta service timeout")
-    
-    except httpx.ConnectError as e:
-        logger.error(
-            "Letta connection error", 
-            path=letta_path, 
-            user_id=user_id, 
-            error=str(e),
-            error_type="ConnectError"
-        )
-        raise HTTPException(status_code=502, detail="Letta service unavailable - connection failed")
-    
-    except httpx.RequestError as e:
-        logger.error(
-            "Letta request error", 
-            path=letta_path, 
-            user_id=user_id, 
-            error=str(e),
-            error_type="RequestError"
-        )
-        raise HTTPException(status_code=502, detail="Letta service unavailable")
-    
     except Exception as e:
+        for error_type, event, status_code, detail in _UPSTREAM_ERRORS:
+            if isinstance(e, error_type):
+                break
+        else:
+            event, status_code, detail = "Letta proxy error", 500, "Internal server error"
+        
         logger.error(
-            "Letta proxy error", 
-            path=letta_path, 
-            user_id=user_id, 
+            event,
+            path=letta_path,
+            user_id=user_id,
             error=str(e),
             error_type=type(e).__name__
         )
-        raise HTTPException(status_code=500, detail="Internal server error")
+        raise HTTPException(status_code=status_code, detail=detail)
 
 @router.get("/health")
-async def letta_health():
+async def letta_health(request: Request):
     """Health check for Letta service."""
     try:
-        letta_client = await get_letta_client()
+        letta_client = request.app.state.letta_client
         response = await letta_client.get("/health")
         
         if response.status_code == 200:
-            return {"status": "healthy", "letta_health": response.json()}
+            return {"status": "healthy", "letta_health": orjson.loads(response.content)}
         else:
             raise HTTPException(status_code=503, detail="Letta service unhealthy")
             
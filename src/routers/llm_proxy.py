@@ -7,14 +7,14 @@ import json
 import asyncio
 from typing import Dict, Any, Optional
 from fastapi import APIRouter, Request, Depends
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 import httpx
+import orjson
 import structlog
 
 from src.config.settings import get_settings
 from src.dependencies.auth import get_current_user_id, verify_agent_secret_key
 from src.models.requests import LLMProxyRequest
-from src.models.responses import LLMResponse
 from src.utils.metrics import metrics
 from src.utils.exceptions import UpstreamError, RequestTimeoutError, AuthorizationError
 
@@ -69,6 +69,10 @@ class LLMProxyClient:
         
         # Add user context for billing
         enhanced_request = request_data.dict(exclude_none=True)
+        # Forward messages exactly as sent, keeping explicit null content
+        enhanced_request["messages"] = [
+            message.model_dump(exclude_unset=True) for message in request_data.messages
+        ]
         enhanced_request["user"] = user_id  # For billing attribution
         
         # Add metadata
@@ -237,7 +241,7 @@ async def agent_llm_proxy(
     
     # Get raw request body
     try:
-        request_body = await request.json()
+        request_body = orjson.loads(await request.body())
     except Exception as e:
         logger.error(
             "Failed to parse request body",
@@ -500,6 +504,7 @@ async def agent_llm_proxy(
                     "Connection": "keep-alive",
                     "X-Accel-Buffering": "no",
                     "Transfer-Encoding": "chunked",
+                    "Content-Encoding": "identity",
                     "X-Content-Type-Options": "nosniff",
                     "X-Frame-Options": "DENY"
                 }
@@ -542,7 +547,7 @@ async def agent_llm_proxy(
                 )
             
             # For successful responses, sanitize and return
-            response_data = response.json()
+            response_data = orjson.loads(response.content)
             
             # Sanitize usage data to fix Gemini null cached_tokens issue
             if "usage" in response_data and response_data["usage"]:
@@ -579,7 +584,7 @@ async def agent_llm_proxy(
                 status_code=response.status_code
             )
             
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=response.status_code,
                 content=response_data
             )
@@ -3,11 +3,11 @@ Admin service for user management and cascade deletion.
 """
 
 from typing import List, Dict, Any, Optional
+import httpx
 import structlog
 
 from src.services.supabase_client import get_supabase_client
 from src.services.litellm_client import get_litellm_client
-from src.routers.letta import get_letta_client
 from src.utils.cache import cache_manager
 
 logger = structlog.get_logger(__name__)
@@ -93,7 +93,12 @@ class AdminService:
             logger.error("Error searching users", error=str(e))
             return []
     
-    async def delete_user_cascade(self, user_id: str) -> Dict[str, Any]:
+    async def delete_user_cascade(
+        self,
+        user_id: str,
+        letta_client: httpx.AsyncClient,
+        user_data: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         Delete user and all associated data in cascade.
         
@@ -107,9 +112,11 @@ class AdminService:
         
         Args:
             user_id: User ID to delete
+            letta_client: Shared Letta HTTP client (app.state.letta_client)
+            user_data: Already-fetched user_profiles row; skips step 1 when given
             
         Returns:
-            Dictionary with deletion results
+            Dictionary with deletion results, or None if the user does not exist
             
         Raises:
             Exception: If any step fails
@@ -118,11 +125,13 @@ class AdminService:
         
         supabase_client = await get_supabase_client()
         
-        # Step 1: Get user data
-        user_data = await supabase_client.get_user_profile_data(user_id)
+        # Step 1: Get user data (unless the caller already has the row)
+        if user_data is None:
+            user_data = await supabase_client.get_user_profile_data(user_id)
         
         if not user_data:
-            raise ValueError(f"User {user_id} not found in user_profiles")
+            logger.warning("User not found in user_profiles", user_id=user_id)
+            return None
         
         letta_agent_id = user_data.get("letta_agent_id")
         litellm_key = user_data.get("litellm_key")
@@ -150,8 +159,6 @@ class AdminService:
         if letta_agent_id:
             try:
                 logger.info("Deleting Letta agent", agent_id=letta_agent_id)
-                letta_client = await get_letta_client()
-                
                 response = await letta_client.delete(f"/v1/agents/{letta_agent_id}")
                 
                 if response.status_code in [200, 204]:
@@ -280,11 +287,18 @@ class AdminService:
         
         return result
     
-    async def delete_all_users(self) -> Dict[str, Any]:
+    async def delete_all_users(self, letta_client: httpx.AsyncClient) -> Dict[str, Any]:
         """
         Delete all users one by one.
         Stops at first error.
         
+        The rows from the initial listing already carry the agent and key IDs
+        needed for the cascade, so each user is deleted without re-reading
+        its profile.
+        
+        Args:
+            letta_client: Shared Letta HTTP client (app.state.letta_client)
+        
         Returns:
             Dictionary with deletion statistics and results
         """
@@ -311,7 +325,17 @@ class AdminService:
             try:
                 logger.info(f"Deleting user {deleted + 1}/{total}", user_id=user_id, email=email)
                 
-                delete_result = await self.delete_user_cascade(user_id)
+                delete_result = await self.delete_user_cascade(user_id, letta_client, user_data=user)
+                
+                if delete_result is None:
+                    # Removed concurrently since the list was fetched
+                    results.append({
+                        "user_id": user_id,
+                        "email": email,
+                        "status": "not_found"
+                    })
+                    continue
+                
                 deleted += 1
                 
                 results.append({
@@ -2,6 +2,7 @@
 AMS (Agent Management Service) HTTP client with caching and error handling.
 """
 
+import importlib.util
 import time
 from typing import Dict, List, Optional, Any
 import httpx
@@ -17,6 +18,8 @@ from src.middleware.circuit_breaker import CircuitBreaker, CircuitBreakerConfig
 
 logger = structlog.get_logger(__name__)
 
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
 
 class AMSClient:
     """HTTP client for AMS (Agent Management Service) with caching and resilience."""
@@ -31,53 +34,30 @@ class AMSClient:
             CircuitBreakerConfig(service_name="ams")
         )
         
-        # Configure HTTP client with Supabase service key
-        try:
-            # Try to enable HTTP/2 if h2 package is available
-            self.client = httpx.AsyncClient(
-                base_url=self.base_url,
-                timeout=httpx.Timeout(
-                    connect=5.0,      # Connection timeout
-                    read=self.timeout,  # Read timeout
-                    write=5.0,        # Write timeout
-                    pool=10.0         # Pool timeout
-                ),
-                headers={
-                    "User-Agent": f"AI-Agent-Gateway/{self.settings.version}",
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {self.settings.supabase_service_key}"
-                },
-                limits=httpx.Limits(
-                    max_keepalive_connections=50,  # Increased for better pooling
-                    max_connections=200,           # Increased total connections
-                    keepalive_expiry=30.0          # Keep connections alive longer
-                ),
-                http2=True,  # Enable HTTP/2 for better performance
-                follow_redirects=True  # Handle redirects automatically
-            )
-        except ImportError:
-            # Fallback to HTTP/1.1 if h2 package is not available
-            self.client = httpx.AsyncClient(
-                base_url=self.base_url,
-                timeout=httpx.Timeout(
-                    connect=5.0,      # Connection timeout
-                    read=self.timeout,  # Read timeout
-                    write=5.0,        # Write timeout
-                    pool=10.0         # Pool timeout
-                ),
-                headers={
-                    "User-Agent": f"AI-Agent-Gateway/{self.settings.version}",
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {self.settings.supabase_service_key}"
-                },
-                limits=httpx.Limits(
-                    max_keepalive_connections=50,  # Increased for better pooling
-                    max_connections=200,           # Increased total connections
-                    keepalive_expiry=30.0          # Keep connections alive longer
-                ),
-                http2=False,  # Disable HTTP/2 fallback
-                follow_redirects=True  # Handle redirects automatically
-            )
+        # Configure HTTP client with Supabase service key. HTTP/2 lets
+        # concurrent proxy requests share a few multiplexed connections; it
+        # needs the h2 package, so fall back to HTTP/1.1 without it.
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(
+                connect=5.0,      # Connection timeout
+                read=self.timeout,  # Read timeout
+                write=5.0,        # Write timeout
+                pool=10.0         # Pool timeout
+            ),
+            headers={
+                "User-Agent": f"AI-Agent-Gateway/{self.settings.version}",
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {self.settings.supabase_service_key}"
+            },
+            limits=httpx.Limits(
+                max_keepalive_connections=100,  # Keep enough idle sockets for proxy bursts
+                max_connections=200,            # Increased total connections
+                keepalive_expiry=60.0           # Keep connections alive longer
+            ),
+            http2=_HTTP2_AVAILABLE,
+            follow_redirects=True  # Handle redirects automatically
+        )
     
     async def close(self):
         """Close HTTP client."""
@@ -90,9 +70,17 @@ class AMSClient:
         user_id: Optional[str] = None,
         headers: Optional[Dict[str, str]] = None,
         json_data: Optional[Dict[str, Any]] = None,
-        params: Optional[Dict[str, Any]] = None
+        params: Optional[Dict[str, Any]] = None,
+        stream: bool = False,
+        raw_body: Optional[bytes] = None
     ) -> httpx.Response:
-        """Make HTTP request with error handling and metrics."""
+        """
+        Make HTTP request with error handling and metrics.
+        
+        raw_body is sent verbatim instead of JSON-encoding json_data; pass the
+        matching Content-Type in headers. With stream=True the body of a successful response is left unread and
+        the caller must close it (``await response.aclose()``).
+        """
         start_time = time.time()
         
         # Prepare headers
@@ -107,13 +95,15 @@ class AMSClient:
             if not await self.circuit_breaker.can_execute():
                 raise UpstreamError("AMS service is currently unavailable (circuit breaker open)")
             
-            response = await self.client.request(
+            request = self.client.build_request(
                 method=method,
                 url=path,
                 headers=request_headers,
                 json=json_data,
+                content=raw_body,
                 params=params
             )
+            response = await self.client.send(request, stream=stream)
             
             # Record success
             await self.circuit_breaker.record_success()
@@ -137,6 +127,10 @@ class AMSClient:
                 # Record failure for circuit breaker
                 await self.circuit_breaker.record_failure()
                 
+                if stream:
+                    # Reading the body to the end also releases the connection
+                    await response.aread()
+                
                 error_detail = None
                 try:
                     error_detail = response.json()
@@ -195,7 +189,7 @@ class AMSClient:
             logger.info("AMS user profile cache hit", user_id=user_id, cached_data=cached_data)
             # Check if cached data is not empty
             if cached_data.get("email") or cached_data.get("letta_agent_id"):
-                return UserProfile(**cached_data)
+                return UserProfile.from_trusted(cached_data)
             else:
                 logger.warning("Cached data is empty, fetching from AMS", user_id=user_id)
                 # Clear empty cache
@@ -373,7 +367,7 @@ class AMSClient:
         # Invalidate user profile cache
         await self._invalidate_user_cache(user_id)
         
-        return AgentInstance(**agent_instance_data)
+        return AgentInstance.from_trusted(agent_instance_data)
     
     async def upgrade_agent(
         self,
@@ -420,7 +414,7 @@ class AMSClient:
         await self._invalidate_user_cache(user_id)
         await self._invalidate_agent_ownership_cache(agent_id)
         
-        return AgentInstance(**data)
+        return AgentInstance.from_trusted(data)
     
     async def validate_template(
         self,
@@ -542,7 +536,7 @@ class AMSClient:
         )
         
         data = response.json()
-        return AgentInstance(**data)
+        return AgentInstance.from_trusted(data)
     
     async def list_user_agents(self, user_id: str) -> List[AgentSummary]:
         """List all agents for a user."""
@@ -553,7 +547,7 @@ class AMSClient:
         )
         
         data = response.json()
-        return [AgentSummary(**agent) for agent in data.get("agents", [])]
+        return AgentSummary.list_from_trusted(data.get("agents", []))
 
 
 # Global client instance
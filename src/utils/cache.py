@@ -4,7 +4,7 @@ Redis caching utilities and cache patterns implementation.
 
 import json
 import pickle
-from typing import Any, Optional, Dict, Union, Callable, TypeVar
+from typing import Any, Optional, Dict, Union, Callable, TypeVar, Sequence
 from functools import wraps
 import asyncio
 import hashlib
@@ -12,6 +12,7 @@ import time
 from datetime import datetime, timedelta
 
 import redis.asyncio as redis
+from redis.exceptions import NoScriptError
 import structlog
 from pydantic import BaseModel
 
@@ -53,6 +54,11 @@ async def get_redis_client() -> redis.Redis:
     return _redis_client
 
 
+def get_cached_redis_client() -> Optional[redis.Redis]:
+    """Return the shared Redis client if it has already been created."""
+    return _redis_client
+
+
 async def close_redis_client():
     """Close Redis client connection."""
     global _redis_client
@@ -63,6 +69,96 @@ async def close_redis_client():
         logger.info("Redis connection closed")
 
 
+class ScriptBatcher:
+    """Auto-pipelines Lua script calls issued within the same event-loop tick.
+    
+    Calls submitted before the loop gets back to the scheduled flush are sent
+    as one non-transactional pipeline, so N concurrent callers share a single
+    round-trip and connection checkout. The script is loaded once (SCRIPT
+    LOAD) and then called by SHA; it is only reloaded if Redis reports
+    NOSCRIPT, e.g. after a restart or SCRIPT FLUSH.
+    """
+    
+    def __init__(self, redis_client: redis.Redis, script, max_batch_size: int = 1000):
+        self.redis = redis_client
+        self.script = script
+        self.max_batch_size = max_batch_size
+        self._sha: Optional[str] = None
+        self._queue: list = []
+        self._flush_scheduled = False
+        self._flush_tasks: set = set()
+    
+    def submit(self, keys: Sequence, args: Sequence) -> asyncio.Future:
+        """Queue a script call and return a future for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((keys, args, future))
+        
+        if len(self._queue) >= self.max_batch_size:
+            self._flush()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._flush)
+        
+        return future
+    
+    def _flush(self):
+        """Hand the queued calls to a background pipeline execution."""
+        self._flush_scheduled = False
+        if not self._queue:
+            return
+        
+        batch, self._queue = self._queue, []
+        task = asyncio.create_task(self._execute(batch))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+    
+    async def _load_script(self) -> str:
+        """Load the script into Redis and remember its SHA."""
+        self._sha = await self.redis.script_load(self.script.script)
+        return self._sha
+    
+    async def _evalsha_batch(self, sha: str, batch: list) -> list:
+        """Send one EVALSHA per queued call in a single pipeline."""
+        # execute() resets the pipeline itself, so no context manager is
+        # needed. The script is deliberately not registered on the pipeline:
+        # that makes execute() send SCRIPT EXISTS first, an extra round trip
+        # per batch; NOSCRIPT is handled by the caller instead
+        pipe = self.redis.pipeline(transaction=False)
+        for keys, args, _ in batch:
+            pipe.evalsha(sha, len(keys), *keys, *args)
+        return await pipe.execute(raise_on_error=False)
+    
+    async def _execute(self, batch: list):
+        """Run one pipeline for the batch and resolve each caller's future."""
+        try:
+            sha = self._sha or await self._load_script()
+            results = await self._evalsha_batch(sha, batch)
+            
+            # Redis lost the script (restart, failover, SCRIPT FLUSH): load it
+            # again and resubmit only the calls that failed with NOSCRIPT
+            missing = [i for i, result in enumerate(results) if isinstance(result, NoScriptError)]
+            if missing:
+                sha = await self._load_script()
+                retried = await self._evalsha_batch(sha, [batch[i] for i in missing])
+                for i, result in zip(missing, retried):
+                    results[i] = result
+        
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
 class CacheManager:
     """Advanced cache manager with multiple strategies."""
     
@@ -0,0 +1,19 @@
+"""
+Shared test configuration.
+
+Settings are loaded when src.main is imported, so the required values are
+provided here before any test module imports the app.
+"""
+
+import os
+
+os.environ.setdefault("AMS_BASE_URL", "http://ams.test")
+os.environ.setdefault("LETTA_BASE_URL", "http://letta.test")
+os.environ.setdefault("LITELLM_BASE_URL", "http://litellm.test")
+os.environ.setdefault("SUPABASE_URL", "http://supabase.test")
+os.environ.setdefault("SUPABASE_JWT_SECRET", "test-jwt-secret-at-least-32-characters")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test-service-key")
+os.environ.setdefault("LETTA_API_KEY", "test-letta-key")
+os.environ.setdefault("AGENT_SECRET_MASTER_KEY", "test-agent-secret-master-key")
+os.environ.setdefault("ADMIN_SECRET_KEY", "test-admin-secret-key")
+os.environ.setdefault("ENABLE_RATE_LIMITING", "true")
@@ -0,0 +1,61 @@
+"""
+Rate limiting runs inside authentication and keys requests by the
+authenticated user.
+"""
+
+from fastapi.testclient import TestClient
+
+from src.main import app
+from src.middleware.auth import AuthMiddleware
+from src.middleware.rate_limit import RateLimitMiddleware, _RateLimitState
+from src.models.common import UserContext
+
+
+def _record_rate_limit_keys(monkeypatch) -> list:
+    """Replace the Redis check with one that records the caller it was given."""
+    seen = []
+    
+    async def check_rate_limit(self, path, user_id):
+        seen.append(user_id)
+        return _RateLimitState(limit=10, remaining=9, reset_time=0)
+    
+    monkeypatch.setattr(RateLimitMiddleware, "_check_rate_limit", check_rate_limit)
+    return seen
+
+
+def test_rate_limit_runs_inside_auth():
+    # user_middleware is outermost first
+    order = [middleware.cls for middleware in app.user_middleware]
+    assert order.index(AuthMiddleware) < order.index(RateLimitMiddleware)
+
+
+def test_rate_limit_keys_jwt_requests_by_user(monkeypatch):
+    seen = _record_rate_limit_keys(monkeypatch)
+    
+    async def validate_jwt_token(self, token):
+        return UserContext(user_id="jwt-user")
+    
+    monkeypatch.setattr(AuthMiddleware, "_validate_jwt_token", validate_jwt_token)
+    
+    client = TestClient(app, raise_server_exceptions=False)
+    response = client.get("/api/v1/not-a-route", headers={"Authorization": "Bearer token"})
+    
+    assert seen == ["jwt-user"]
+    assert response.headers["x-ratelimit-limit"] == "10"
+
+
+def test_rate_limit_keys_agent_secret_requests_by_user(monkeypatch):
+    seen = _record_rate_limit_keys(monkeypatch)
+    
+    async def validate_agent_secret(self, secret_key, path):
+        return "agent-user"
+    
+    monkeypatch.setattr(AuthMiddleware, "_validate_agent_secret", validate_agent_secret)
+    
+    client = TestClient(app, raise_server_exceptions=False)
+    client.get(
+        "/api/v1/agents/agent-user/proxy/chat/completions",
+        headers={"Authorization": "Bearer secret"}
+    )
+    
+    assert seen == ["agent-user"]